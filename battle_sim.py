@@ -1,10 +1,22 @@
 # battle_sim.py
+import bisect
+from array import array
+import functools
 import math
+import random
 import re
 import json
+from typing import Optional
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
+# orjson (optional) parses large character files several times faster.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 
 # --------------- Mechanics (duplicated from sheet_tool / damage_lab) ---------------
 
@@ -14,6 +26,18 @@ ABILITY_MODS = {
     "outer": {"dmg": 0.75, "mana": 2.00},
 }
 
+# Slot index for the attack path; unknown/missing slots resolve as "inner" (1.0x / 1.0x)
+_SLOT_NAMES = ("core", "inner", "outer")
+_SLOT_IDX = {name: i for i, name in enumerate(_SLOT_NAMES)}
+SLOT_INNER = _SLOT_IDX["inner"]
+_ABILITY_MODS_DMG = tuple(float(ABILITY_MODS[n]["dmg"]) for n in _SLOT_NAMES)
+_ABILITY_MODS_MANA = tuple(float(ABILITY_MODS[n]["mana"]) for n in _SLOT_NAMES)
+
+
+def slot_index(slot) -> int:
+    return _SLOT_IDX.get(slot, SLOT_INNER)
+
+
 STAT_ORDER = [
     ("melee_acc",  "Melee Acc"),
     ("ranged_acc", "Ranged Acc"),
@@ -30,6 +54,39 @@ STAT_ORDER = [
 ]
 STAT_KEYS = [k for k, _ in STAT_ORDER]
 
+# Sim characters store stats as a list in STAT_KEYS order; index with these.
+STAT_IDX = {k: i for i, k in enumerate(STAT_KEYS)}
+MELEE_ACC_I = STAT_IDX["melee_acc"]
+RANGED_ACC_I = STAT_IDX["ranged_acc"]
+SPELLCRAFT_I = STAT_IDX["spellcraft"]
+PBD_I = STAT_IDX["pbd"]
+PRECISION_I = STAT_IDX["precision"]
+PHYS_DEF_I = STAT_IDX["phys_def"]
+EVASION_I = STAT_IDX["evasion"]
+
+# Mutable per-character resources live in char["res"], an int array indexed with these.
+HP_C, HP_M, MN_C, MN_M, MD = 0, 1, 2, 3, 4
+
+
+def sim_resources(hp_current: int, hp_max: int, mana_current: int, mana_max: int,
+                  mana_density: int) -> array:
+    return array("i", (hp_current, hp_max, mana_current, mana_max, mana_density, 0))
+
+
+def sim_stats(getter) -> list:
+    """Stats list in STAT_KEYS order; getter(stat_key) supplies each value."""
+    return [getter(k) for k in STAT_KEYS]
+
+
+def accuracy_source(kind: str, ref: dict) -> tuple:
+    """(stats index, log label) of the accuracy stat an action rolls against."""
+    if kind == "ability":
+        return SPELLCRAFT_I, "Spellcraft"
+    if ref.get("is_ranged", False):
+        return RANGED_ACC_I, "Ranged Acc"
+    return MELEE_ACC_I, "Melee Acc"
+
+
 # Combat-relevant stats shown in the character panels
 COMBAT_STATS = [
     ("melee_acc",     "Melee Acc"),
@@ -44,40 +101,73 @@ COMBAT_STATS = [
 ]
 
 
-def parse_damage_expr(expr: str):
-    if not expr:
-        return None
-    s = expr.replace(" ", "").lower()
-    m = re.search(r'(\d*)d(\d+)', s)
+_DICE_RE = re.compile(r'(\d*)d(\d+)')
+_BONUS_RE = re.compile(r'([+-])(\d+)')
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_damage_cached(s: str):
+    m = _DICE_RE.search(s)
     if not m:
         return None
     dice_count = int(m.group(1)) if m.group(1) else 1
     die_size = int(m.group(2))
     flat_bonus = 0
     rest = s[m.end():]
-    for sign, num in re.findall(r'([+-])(\d+)', rest):
+    for sign, num in _BONUS_RE.findall(rest):
         flat_bonus += int(num) if sign == '+' else -int(num)
     return dice_count, die_size, flat_bonus
 
 
-def mana_density_multiplier(points: int) -> float:
+def parse_damage_expr(expr: str):
+    if not expr:
+        return None
+    s = expr.replace(" ", "").lower()
+    if "d" not in s:
+        return None
+    return _parse_damage_cached(s)
+
+
+def _clamp_int(x, lo: int, hi: Optional[int] = None) -> int:
+    """Coerce x to int (unparseable -> lo) and clamp to [lo, hi]. Ints skip the coercion."""
+    if not isinstance(x, int):
+        try:
+            x = int(x)
+        except (ValueError, TypeError):
+            return lo
+    if x < lo:
+        return lo
+    if hi is not None and x > hi:
+        return hi
+    return x
+
+
+def _safe_int(v, default=0) -> int:
+    """int(v or default), or default when v can't be parsed. Nonzero ints pass straight through."""
+    if v and isinstance(v, int):
+        return v
     try:
-        p = int(points)
-    except Exception:
-        p = 0
-    p = max(0, p)
+        return int(v or default)
+    except (ValueError, TypeError):
+        return default
+
+
+_INV_LOG100 = 1.0 / math.log(100.0)
+
+
+@functools.lru_cache(maxsize=4096)
+def _mana_density_cached(p: int) -> float:
     if p <= 100:
         return 1.0 + (p / 100.0)
-    return 2.0 + (math.log(p / 100.0) / math.log(100.0))
+    return 2.0 + math.log(p * 0.01) * _INV_LOG100
 
 
-def hit_roll_multiplier(d20_roll: int) -> float:
+def mana_density_multiplier(points: int) -> float:
+    return _mana_density_cached(_clamp_int(points, 0))
+
+
+def _interp_hit_roll(r: int) -> float:
     anchors = [(1, 0.05), (2, 0.20), (10, 1.00), (19, 2.00), (20, 5.00)]
-    try:
-        r = int(d20_roll)
-    except Exception:
-        r = 1
-    r = max(1, min(20, r))
     if r <= anchors[0][0]:
         return anchors[0][1]
     if r >= anchors[-1][0]:
@@ -89,28 +179,45 @@ def hit_roll_multiplier(d20_roll: int) -> float:
     return 1.0
 
 
+# d20 -> accuracy multiplier, precomputed for every face (index = roll - 1).
+_HIT_MULT = tuple(_interp_hit_roll(r) for r in range(1, 21))
+
+
+def hit_roll_multiplier(d20_roll: int) -> float:
+    return _HIT_MULT[_clamp_int(d20_roll, 1, 20) - 1]
+
+
+# Glancing-blow anchors: accuracy/evasion ratio -> damage multiplier.
+_EVA_X = (0.90, 0.95, 1.00, 1.05, 1.10)
+_EVA_Y = (0.0, 0.25, 0.50, 0.75, 1.0)
+
+
 def evasion_damage_multiplier(effective_accuracy: float, evasion: float) -> float:
     if evasion <= 0:
         return 1.0
     ratio = effective_accuracy / evasion
-    anchors = [(0.90, 0.0), (0.95, 0.25), (1.00, 0.50), (1.05, 0.75), (1.10, 1.0)]
-    if ratio <= anchors[0][0]:
-        return anchors[0][1]
-    if ratio >= anchors[-1][0]:
-        return anchors[-1][1]
-    for (r0, m0), (r1, m1) in zip(anchors, anchors[1:]):
-        if r0 <= ratio <= r1:
-            t = (ratio - r0) / (r1 - r0)
-            return m0 + t * (m1 - m0)
-    return 1.0
+    if ratio <= _EVA_X[0]:
+        return _EVA_Y[0]
+    if ratio >= _EVA_X[-1]:
+        return _EVA_Y[-1]
+    i = bisect.bisect_left(_EVA_X, ratio)
+    x0, x1 = _EVA_X[i - 1], _EVA_X[i]
+    y0, y1 = _EVA_Y[i - 1], _EVA_Y[i]
+    return y0 + (ratio - x0) / (x1 - x0) * (y1 - y0)
 
 
 def phys_dr_from_points(phys_def_points: int) -> int:
-    try:
-        p = int(phys_def_points)
-    except Exception:
-        p = 0
-    return max(0, p // 5)
+    return _clamp_int(phys_def_points, 0) // 5
+
+
+@functools.lru_cache(maxsize=1024)
+def _overcast_bonus_cached(base_cost_eff: int, spent_eff: int, scale: int, power: float, cap: int) -> int:
+    ratio = spent_eff / base_cost_eff
+    x = math.log2(ratio)
+    bonus = int(math.floor(scale * (x ** power)))
+    if cap >= 0:
+        bonus = min(bonus, cap)
+    return max(0, bonus)
 
 
 def compute_overcast_bonus(base_cost_eff: int, spent_eff: int, over: dict) -> int:
@@ -118,26 +225,15 @@ def compute_overcast_bonus(base_cost_eff: int, spent_eff: int, over: dict) -> in
         return 0
     if not isinstance(over, dict) or not over.get("enabled", False):
         return 0
-    try:
-        scale = int(over.get("scale", 0) or 0)
-    except Exception:
-        scale = 0
+    scale = _safe_int(over.get("scale"), 0)
+    if scale <= 0:
+        return 0
     try:
         power = float(over.get("power", 0.85) or 0.85)
-    except Exception:
+    except (ValueError, TypeError):
         power = 0.85
-    try:
-        cap = int(over.get("cap", 999) or 999)
-    except Exception:
-        cap = 999
-    if scale <= 0:
-        return 0
-    ratio = spent_eff / base_cost_eff
-    x = math.log(ratio, 2.0)
-    bonus = int(math.floor(scale * (x ** power)))
-    if cap >= 0:
-        bonus = min(bonus, cap)
-    return max(0, bonus)
+    cap = _safe_int(over.get("cap"), 999)
+    return _overcast_bonus_cached(int(base_cost_eff), int(spent_eff), scale, power, cap)
 
 
 def _migrate_stats(char: dict):
@@ -172,50 +268,57 @@ def _migrate_stats(char: dict):
             stats["mana_density"] = old_md
 
 
+_ITEM_DEFAULTS = {"name": "", "favorite": False, "roll_type": "None",
+                  "damage": "", "notes": "", "apply_bonus": True, "is_ranged": False}
+_ABILITY_DEFAULTS = {"name": "", "favorite": False, "roll_type": "None",
+                     "damage": "", "mana_cost": 0, "notes": ""}
+_OVERCAST_DEFAULTS = {"enabled": False, "scale": 0, "power": 0.85, "cap": 999}
+
+
 def _ensure_item(x):
+    """Normalize an item dict in place (new dict only for str/invalid input)."""
     if isinstance(x, str):
-        return {"name": x, "favorite": False, "roll_type": "None",
-                "damage": "", "notes": "", "apply_bonus": True, "is_ranged": False}
-    if isinstance(x, dict):
-        return {
-            "name": x.get("name", ""),
-            "favorite": bool(x.get("favorite", False)),
-            "roll_type": x.get("roll_type", "None"),
-            "damage": x.get("damage", ""),
-            "notes": x.get("notes", ""),
-            "apply_bonus": bool(x.get("apply_bonus", x.get("apply_pbd", True))),
-            "is_ranged": bool(x.get("is_ranged", False)),
-        }
-    return {"name": "", "favorite": False, "roll_type": "None",
-            "damage": "", "notes": "", "apply_bonus": True, "is_ranged": False}
+        d = dict(_ITEM_DEFAULTS)
+        d["name"] = x
+        return d
+    if not isinstance(x, dict):
+        return dict(_ITEM_DEFAULTS)
+    if "apply_bonus" not in x:
+        x["apply_bonus"] = x.get("apply_pbd", True)
+    for k, v in _ITEM_DEFAULTS.items():
+        x.setdefault(k, v)
+    for k in ("favorite", "apply_bonus", "is_ranged"):
+        if not isinstance(x[k], bool):
+            x[k] = bool(x[k])
+    return x
 
 
 def _ensure_ability(x):
-    if isinstance(x, str):
-        return {"name": x, "favorite": False, "roll_type": "None",
-                "damage": "", "mana_cost": 0, "notes": "",
-                "overcast": {"enabled": False, "scale": 0, "power": 0.85, "cap": 999}}
-    if isinstance(x, dict):
-        over = x.get("overcast", {})
-        if not isinstance(over, dict):
-            over = {}
-        return {
-            "name": x.get("name", ""),
-            "favorite": bool(x.get("favorite", False)),
-            "roll_type": x.get("roll_type", "None"),
-            "damage": x.get("damage", ""),
-            "mana_cost": int(x.get("mana_cost", 0) or 0),
-            "notes": x.get("notes", ""),
-            "overcast": {
-                "enabled": bool(over.get("enabled", False)),
-                "scale": int(over.get("scale", 0) or 0),
-                "power": float(over.get("power", 0.85) or 0.85),
-                "cap": int(over.get("cap", 999) or 999),
-            },
-        }
-    return {"name": "", "favorite": False, "roll_type": "None",
-            "damage": "", "mana_cost": 0, "notes": "",
-            "overcast": {"enabled": False, "scale": 0, "power": 0.85, "cap": 999}}
+    """Normalize an ability dict in place (new dict only for str/invalid input)."""
+    if isinstance(x, str) or not isinstance(x, dict):
+        d = dict(_ABILITY_DEFAULTS)
+        d["name"] = x if isinstance(x, str) else ""
+        d["overcast"] = dict(_OVERCAST_DEFAULTS)
+        return d
+    for k, v in _ABILITY_DEFAULTS.items():
+        x.setdefault(k, v)
+    if not isinstance(x["favorite"], bool):
+        x["favorite"] = bool(x["favorite"])
+    if not isinstance(x["mana_cost"], int):
+        x["mana_cost"] = int(x["mana_cost"] or 0)
+
+    over = x.get("overcast")
+    if not isinstance(over, dict):
+        over = x["overcast"] = {}
+    for k, v in _OVERCAST_DEFAULTS.items():
+        over.setdefault(k, v)
+    if not isinstance(over["enabled"], bool):
+        over["enabled"] = bool(over["enabled"])
+    if not isinstance(over["scale"], int):
+        over["scale"] = int(over["scale"] or 0)
+    over["power"] = float(over["power"] or 0.85)
+    over["cap"] = int(over["cap"] or 999)
+    return x
 
 
 # --------------- Sim character builder ---------------
@@ -236,8 +339,10 @@ def build_sim_character(char_dict: dict) -> dict:
         if not it.get("name"):
             continue
         rng = "Ranged" if it.get("is_ranged", False) else "Melee"
+        acc_idx, acc_label = accuracy_source("item", it)
         actions.append({
             "kind": "item", "slot": None, "ref": it,
+            "acc_idx": acc_idx, "acc_label": acc_label,
             "name": it["name"],
             "display": f"{it['name']}  (Item:{rng})",
         })
@@ -247,23 +352,155 @@ def build_sim_character(char_dict: dict) -> dict:
             if not ab.get("name"):
                 continue
             actions.append({
-                "kind": "ability", "slot": slot, "ref": ab,
+                "kind": "ability", "slot": slot, "slot_idx": _SLOT_IDX[slot], "ref": ab,
+                "acc_idx": SPELLCRAFT_I, "acc_label": "Spellcraft",
                 "name": ab["name"],
                 "display": f"{ab['name']}  (Ability:{slot})",
             })
 
     return {
         "name": char_dict.get("name", "Unknown"),
-        "stats": {k: int(stats.get(k, 0) or 0) for k in STAT_KEYS},
-        "hp_max": int(hp.get("max", 20) or 20),
-        "hp_current": int(hp.get("current", hp.get("max", 20)) or 20),
-        "mana_max": int(mana.get("max", 10) or 10),
-        "mana_current": int(mana.get("current", mana.get("max", 10)) or 10),
-        "mana_density": int(stats.get("mana_density", 0) or 0),
+        "stats": [int(stats.get(k, 0) or 0) for k in STAT_KEYS],
+        "res": sim_resources(
+            int(hp.get("current", hp.get("max", 20)) or 20),
+            int(hp.get("max", 20) or 20),
+            int(mana.get("current", mana.get("max", 10)) or 10),
+            int(mana.get("max", 10) or 10),
+            int(stats.get("mana_density", 0) or 0),
+        ),
         "actions": actions,
     }
 
 
+# --------------- Attack resolution (pure, no UI) ---------------
+
+BATCH_SIM_SIZE = 10_000
+
+
+def resolve_accuracy(attacker: dict, defender: dict, action: dict, d20: int) -> dict:
+    """Effective accuracy and glancing-blow multiplier for one attack roll."""
+    acc_idx = action.get("acc_idx")
+    if acc_idx is None:
+        acc_idx, acc_label = accuracy_source(action["kind"], action["ref"])
+    else:
+        acc_label = action["acc_label"]
+    acc_stat = attacker["stats"][acc_idx]
+
+    roll_mult = hit_roll_multiplier(d20)
+    effective_acc = acc_stat * roll_mult
+    evasion = defender["stats"][EVASION_I]
+    glance_mult = evasion_damage_multiplier(effective_acc, evasion)
+    return {
+        "acc_stat": acc_stat, "acc_label": acc_label, "roll_mult": roll_mult,
+        "effective_acc": effective_acc, "evasion": evasion,
+        "glance_mult": glance_mult, "glance_pct": int(glance_mult * 100),
+    }
+
+
+def resolve_damage(attacker: dict, defender: dict, action: dict, dmg_roll: int,
+                   mana_spend=None, glance_mult: float = 1.0) -> dict:
+    """Final damage (and mana cost for abilities) of one hit. Mutates nothing.
+
+    mana_spend of None means "spend the base cost"; spends below it are raised to it.
+    """
+    ref = action["ref"]
+    parsed = parse_damage_expr((ref.get("damage") or "").strip())
+    flat_bonus = parsed[2] if parsed else 0
+    base_damage = dmg_roll + flat_bonus
+    out = {"flat_bonus": flat_bonus, "base_damage": base_damage, "spent_eff": 0}
+
+    if action["kind"] == "item":
+        # PBD / Precision multiplier
+        total = base_damage
+        if ref.get("apply_bonus", True):
+            is_ranged = ref.get("is_ranged", False)
+            mult = mana_density_multiplier(attacker["stats"][PRECISION_I if is_ranged else PBD_I])
+            total = int(math.floor(base_damage * mult))
+            out["mult"] = mult
+            out["mult_label"] = "Precision" if is_ranged else "PBD"
+    else:
+        slot = action.get("slot") or "inner"
+        slot_idx = action.get("slot_idx")
+        if slot_idx is None:
+            slot_idx = slot_index(slot)
+        dmg_mult = _ABILITY_MODS_DMG[slot_idx]
+        mana_mult = _ABILITY_MODS_MANA[slot_idx]
+
+        base_cost = int(ref.get("mana_cost", 0) or 0)
+        if mana_spend is None or mana_spend < base_cost:
+            mana_spend = base_cost
+        base_eff = int(math.ceil(base_cost * mana_mult))
+        spent_eff = int(math.ceil(mana_spend * mana_mult))
+
+        md_mult = mana_density_multiplier(attacker["res"][MD])
+        over_bonus = compute_overcast_bonus(base_eff, spent_eff, ref.get("overcast", {}))
+        total = int(math.floor((base_damage + over_bonus) * dmg_mult * md_mult))
+        out.update(slot=slot, dmg_mult=dmg_mult, mana_mult=mana_mult, base_cost=base_cost,
+                   spent_eff=spent_eff, md_mult=md_mult, over_bonus=over_bonus)
+
+    after_glance = int(math.floor(total * glance_mult))
+    dr = phys_dr_from_points(defender["stats"][PHYS_DEF_I])
+    out.update(total=total, after_glance=after_glance, dr=dr, final=max(0, after_glance - dr))
+    return out
+
+
+def simulate_batch(attacker: dict, defender: dict, action: dict, n: int,
+                   mana_spend=None, rng=random) -> list:
+    """Roll `n` independent attacks (random d20 + damage dice) and return the final
+    damage of each (0 on a miss). Character HP/mana are not touched.
+
+    Everything except the two rolls is fixed for a given matchup, so it is resolved
+    once up front: a glancing multiplier per d20 face, and the damage pipeline reduced
+    to floor(floor((roll + add) * m1 * m2) * glance) - dr.
+    """
+    parsed = parse_damage_expr((action["ref"].get("damage") or "").strip())
+    dice_count, die_size = (parsed[0], parsed[1]) if parsed else (0, 0)
+
+    glance = [resolve_accuracy(attacker, defender, action, r)["glance_mult"] for r in range(1, 21)]
+    hits = [int(g * 100) != 0 for g in glance]
+
+    probe = resolve_damage(attacker, defender, action, 0, mana_spend)
+    if action["kind"] == "item":
+        add, m1, m2 = probe["flat_bonus"], probe.get("mult", 1.0), 1.0
+    else:
+        add, m1, m2 = probe["flat_bonus"] + probe["over_bonus"], probe["dmg_mult"], probe["md_mult"]
+    dr = probe["dr"]
+
+    randint = rng.randint
+    floor = math.floor
+    dice = range(dice_count) if die_size > 0 else ()
+    results = [0] * n
+    for i in range(n):
+        face = randint(1, 20) - 1
+        if not hits[face]:
+            continue
+        roll = 0
+        for _ in dice:
+            roll += randint(1, die_size)
+        after_glance = int(floor(int(floor((roll + add) * m1 * m2)) * glance[face]))
+        if after_glance > dr:
+            results[i] = after_glance - dr
+    return results
+
+
+def format_damage_histogram(results: list, bins: int = 10, width: int = 40) -> list:
+    """Text histogram lines ("lo-hi | ####  count") for a list of damage values."""
+    if not results:
+        return []
+    lo, hi = min(results), max(results)
+    span = max(1, (hi - lo + bins) // bins)
+    counts = [0] * ((hi - lo) // span + 1)
+    for v in results:
+        counts[(v - lo) // span] += 1
+    peak = max(counts)
+    lines = []
+    for i, c in enumerate(counts):
+        b_lo = lo + i * span
+        bar = "#" * (int(round(c * width / peak)) if peak else 0)
+        lines.append(f"{b_lo:>5}-{b_lo + span - 1:<5} | {bar} {c}")
+    return lines
+
+
 # --------------- UI ---------------
 
 class BattleSimTab(ttk.Frame):
@@ -276,10 +513,18 @@ class BattleSimTab(ttk.Frame):
 
         self.char_a = None  # sim dict
         self.char_b = None  # sim dict
+        # Listbox labels per side, rebuilt only when that character is (re)loaded
+        self._actions_display_a = ()
+        self._actions_display_b = ()
 
         self._colors = None
         self._tk_widgets = []  # raw tk widgets for theme
 
+        # Cached per event: attacker side (updated by the var_attacker trace) and the
+        # selected action (updated on <<ListboxSelect>>, cleared when the list is rebuilt).
+        self._attacker_is_a = True
+        self._selected_action = None
+
         # UI vars
         self.var_attacker = tk.StringVar(value="A")
         self.var_d20 = tk.StringVar()
@@ -338,6 +583,7 @@ class BattleSimTab(ttk.Frame):
         ttk.Label(row0, text="Action:").pack(side=tk.LEFT, padx=(0, 4))
         self.action_list = tk.Listbox(row0, height=4, width=40, exportselection=False)
         self.action_list.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 8))
+        self.action_list.bind("<<ListboxSelect>>", lambda _e: self._on_action_selected())
         self._tk_widgets.append(self.action_list)
 
         row1 = ttk.Frame(action_frame)
@@ -357,6 +603,7 @@ class BattleSimTab(ttk.Frame):
 
         ttk.Button(row2, text="Attack!", command=self._do_attack).pack(side=tk.LEFT, padx=(0, 8))
         ttk.Button(row2, text="Check Accuracy", command=self._do_check_accuracy).pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Button(row2, text="Run 10k", command=self._do_batch_sim).pack(side=tk.LEFT, padx=(0, 8))
         ttk.Label(row2, textvariable=self.var_status, foreground="gray").pack(side=tk.LEFT, padx=(8, 0))
 
         # Combat log
@@ -399,14 +646,14 @@ class BattleSimTab(ttk.Frame):
         # Stats (2 columns of key-value pairs)
         stats_frame = ttk.Frame(frame)
         stats_frame.grid(row=4, column=0, columnspan=4, sticky="ew", padx=8, pady=(4, 8))
-        stat_vars = {}
+        stat_vars = []
         for i, (key, label) in enumerate(COMBAT_STATS):
             col = (i // 4) * 2
             row = i % 4
             sv = tk.StringVar(value="--")
             ttk.Label(stats_frame, text=f"{label}:").grid(row=row, column=col, sticky="w", padx=(0, 4), pady=1)
             ttk.Label(stats_frame, textvariable=sv, width=6).grid(row=row, column=col + 1, sticky="w", padx=(0, 12), pady=1)
-            stat_vars[key] = sv
+            stat_vars.append((STAT_IDX[key], sv))
 
         frame.columnconfigure(2, weight=1)
         frame.columnconfigure(3, weight=1)
@@ -419,39 +666,58 @@ class BattleSimTab(ttk.Frame):
         frame._mana_bar = mana_bar
         frame._md_label = md_label
         frame._stat_vars = stat_vars
+        frame._last_snap = None  # last values pushed to the widgets
 
         return frame
 
     def _update_panel(self, panel, char):
         if char is None:
+            if panel._last_snap == ():
+                return
+            panel._last_snap = ()
             panel._name_var.set("(not loaded)")
             panel._hp_label.set("HP: --/--")
             panel._hp_bar["value"] = 0
             panel._mana_label.set("Mana: --/--")
             panel._mana_bar["value"] = 0
             panel._md_label.set("Mana Density: --")
-            for sv in panel._stat_vars.values():
+            for _, sv in panel._stat_vars:
                 sv.set("--")
             return
 
-        panel._name_var.set(char["name"])
+        name = char["name"]
+        hp_c, hp_m, mn_c, mn_m, md = char["res"][:5]
+        stats = tuple(char["stats"])
+        snap = (name, hp_c, hp_m, mn_c, mn_m, md, stats)
+        prev = panel._last_snap
+        if snap == prev:
+            return
+        panel._last_snap = snap
+        if not prev:
+            prev = (None,) * 7
+
+        if name != prev[0]:
+            panel._name_var.set(name)
 
-        hp_c, hp_m = char["hp_current"], char["hp_max"]
-        panel._hp_label.set(f"HP: {hp_c}/{hp_m}")
-        panel._hp_bar["maximum"] = max(1, hp_m)
-        panel._hp_bar["value"] = max(0, hp_c)
+        if (hp_c, hp_m) != prev[1:3]:
+            panel._hp_label.set(f"HP: {hp_c}/{hp_m}")
+            panel._hp_bar["maximum"] = max(1, hp_m)
+            panel._hp_bar["value"] = max(0, hp_c)
 
-        mn_c, mn_m = char["mana_current"], char["mana_max"]
-        panel._mana_label.set(f"Mana: {mn_c}/{mn_m}")
-        panel._mana_bar["maximum"] = max(1, mn_m)
-        panel._mana_bar["value"] = max(0, mn_c)
+        if (mn_c, mn_m) != prev[3:5]:
+            panel._mana_label.set(f"Mana: {mn_c}/{mn_m}")
+            panel._mana_bar["maximum"] = max(1, mn_m)
+            panel._mana_bar["value"] = max(0, mn_c)
 
-        md = char["mana_density"]
-        md_mult = mana_density_multiplier(md)
-        panel._md_label.set(f"Mana Density: {md}  ({md_mult:.2f}x)")
+        if md != prev[5]:
+            md_mult = mana_density_multiplier(md)
+            panel._md_label.set(f"Mana Density: {md}  ({md_mult:.2f}x)")
 
-        for key, sv in panel._stat_vars.items():
-            sv.set(str(char["stats"].get(key, 0)))
+        if stats != prev[6]:
+            for idx, sv in panel._stat_vars:
+                val = str(stats[idx])
+                if sv.get() != val:
+                    sv.set(val)
 
     # ---- Character loading ----
 
@@ -461,8 +727,9 @@ class BattleSimTab(ttk.Frame):
             self.char_a = None
         else:
             self.char_a = data
+        self._actions_display_a = self._action_labels(self.char_a)
         self._update_panel(self.panel_a, self.char_a)
-        if self.var_attacker.get() == "A":
+        if self._attacker_is_a:
             self._populate_action_list()
         self.var_status.set("Character A refreshed from sheet.")
 
@@ -474,11 +741,12 @@ class BattleSimTab(ttk.Frame):
         if not path:
             return
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                raw = json.load(f)
+            with open(path, "rb") as f:
+                raw = _json_loads(f.read())
             self.char_b = build_sim_character(raw)
+            self._actions_display_b = self._action_labels(self.char_b)
             self._update_panel(self.panel_b, self.char_b)
-            if self.var_attacker.get() == "B":
+            if not self._attacker_is_a:
                 self._populate_action_list()
             self.var_status.set(f"Loaded Character B: {self.char_b['name']}")
         except Exception as e:
@@ -486,52 +754,69 @@ class BattleSimTab(ttk.Frame):
 
     def _reset_sim(self):
         if self.char_a:
-            self.char_a["hp_current"] = self.char_a["hp_max"]
-            self.char_a["mana_current"] = self.char_a["mana_max"]
+            res = self.char_a["res"]
+            res[HP_C] = res[HP_M]
+            res[MN_C] = res[MN_M]
             self._update_panel(self.panel_a, self.char_a)
         if self.char_b:
-            self.char_b["hp_current"] = self.char_b["hp_max"]
-            self.char_b["mana_current"] = self.char_b["mana_max"]
+            res = self.char_b["res"]
+            res[HP_C] = res[HP_M]
+            res[MN_C] = res[MN_M]
             self._update_panel(self.panel_b, self.char_b)
         self.var_status.set("HP and Mana reset to max.")
 
     # ---- Action list ----
 
     def _on_attacker_changed(self):
+        self._attacker_is_a = self.var_attacker.get() == "A"
         self._populate_action_list()
 
+    @staticmethod
+    def _action_labels(char) -> tuple:
+        if char is None:
+            return ()
+        return tuple(a["display"] for a in char.get("actions", []))
+
     def _populate_action_list(self):
+        self._selected_action = None
         self.action_list.delete(0, tk.END)
-        attacker = self._get_attacker()
-        if attacker is None:
-            return
-        for a in attacker.get("actions", []):
-            self.action_list.insert(tk.END, a["display"])
+        labels = self._actions_display_a if self._attacker_is_a else self._actions_display_b
+        if labels:
+            self.action_list.insert(tk.END, *labels)
 
     def _get_attacker(self):
-        return self.char_a if self.var_attacker.get() == "A" else self.char_b
+        return self.char_a if self._attacker_is_a else self.char_b
 
     def _get_defender(self):
-        return self.char_b if self.var_attacker.get() == "A" else self.char_a
+        return self.char_b if self._attacker_is_a else self.char_a
 
-    def _get_selected_action(self):
+    def _on_action_selected(self):
+        self._selected_action = None
         attacker = self._get_attacker()
         if attacker is None:
-            return None
-        sel = list(self.action_list.curselection())
+            return
+        sel = self.action_list.curselection()
         if len(sel) != 1:
-            return None
+            return
         idx = sel[0]
         actions = attacker.get("actions", [])
         if 0 <= idx < len(actions):
-            return actions[idx]
-        return None
+            self._selected_action = actions[idx]
+
+    def _get_selected_action(self):
+        return self._selected_action
 
     # ---- Combat log ----
 
     def _log(self, msg: str):
+        self._log_many([msg])
+
+    def _log_many(self, msgs: list):
+        """Append several lines to the log with a single Text insert."""
+        if not msgs:
+            return
         self.log_text.configure(state=tk.NORMAL)
-        self.log_text.insert(tk.END, msg + "\n")
+        self.log_text.insert(tk.END, "\n".join(msgs) + "\n")
         self.log_text.see(tk.END)
         self.log_text.configure(state=tk.DISABLED)
 
@@ -560,25 +845,10 @@ class BattleSimTab(ttk.Frame):
             messagebox.showwarning("Battle Sim", "d20 roll must be a number.")
             return
 
-        ref = action["ref"]
-        kind = action["kind"]
-
-        # Determine accuracy stat
-        if kind == "ability":
-            acc_stat = attacker["stats"].get("spellcraft", 0)
-            acc_label = "Spellcraft"
-        elif ref.get("is_ranged", False):
-            acc_stat = attacker["stats"].get("ranged_acc", 0)
-            acc_label = "Ranged Acc"
-        else:
-            acc_stat = attacker["stats"].get("melee_acc", 0)
-            acc_label = "Melee Acc"
-
-        roll_mult = hit_roll_multiplier(d20)
-        effective_acc = acc_stat * roll_mult
-        evasion = defender["stats"].get("evasion", 0)
-        glance_mult = evasion_damage_multiplier(effective_acc, evasion)
-        glance_pct = int(glance_mult * 100)
+        acc = resolve_accuracy(attacker, defender, action, d20)
+        acc_stat, acc_label = acc["acc_stat"], acc["acc_label"]
+        roll_mult, effective_acc = acc["roll_mult"], acc["effective_acc"]
+        evasion, glance_pct = acc["evasion"], acc["glance_pct"]
 
         a_name = attacker["name"]
         d_name = defender["name"]
@@ -609,7 +879,6 @@ class BattleSimTab(ttk.Frame):
 
         ref = action["ref"]
         kind = action["kind"]
-        slot = action.get("slot")
         a_name = attacker["name"]
         d_name = defender["name"]
 
@@ -624,17 +893,8 @@ class BattleSimTab(ttk.Frame):
             messagebox.showwarning("Battle Sim", "Damage Roll must be a number.")
             return
 
-        # Parse damage expression for flat bonus
-        dmg_expr = (ref.get("damage") or "").strip()
-        parsed = parse_damage_expr(dmg_expr)
-        flat_bonus = 0
-        if parsed:
-            _, _, flat_bonus = parsed
-        base_damage = dmg_roll + flat_bonus
-
         # ---- Accuracy + Glancing blow ----
         d20_str = self.var_d20.get().strip()
-        effective_acc = None
         glance_mult = 1.0
         glance_pct = 100
         acc_info = ""
@@ -645,23 +905,11 @@ class BattleSimTab(ttk.Frame):
             except ValueError:
                 d20 = 10
 
-            if kind == "ability":
-                acc_stat = attacker["stats"].get("spellcraft", 0)
-                acc_label = "Spellcraft"
-            elif ref.get("is_ranged", False):
-                acc_stat = attacker["stats"].get("ranged_acc", 0)
-                acc_label = "Ranged Acc"
-            else:
-                acc_stat = attacker["stats"].get("melee_acc", 0)
-                acc_label = "Melee Acc"
+            acc = resolve_accuracy(attacker, defender, action, d20)
+            glance_mult = acc["glance_mult"]
+            glance_pct = acc["glance_pct"]
 
-            roll_mult = hit_roll_multiplier(d20)
-            effective_acc = acc_stat * roll_mult
-            evasion = defender["stats"].get("evasion", 0)
-            glance_mult = evasion_damage_multiplier(effective_acc, evasion)
-            glance_pct = int(glance_mult * 100)
-
-            acc_info = f"Acc {effective_acc:.1f} vs Eva {evasion} → {glance_pct}%"
+            acc_info = f"Acc {acc['effective_acc']:.1f} vs Eva {acc['evasion']} → {glance_pct}%"
 
             if glance_pct == 0:
                 self._log(f"{a_name} attacks {d_name} with {ref['name']}: {acc_info} — MISS!")
@@ -669,114 +917,93 @@ class BattleSimTab(ttk.Frame):
                 return
 
         # ---- Damage calculation ----
+        mana_spend = None
+        if kind != "item":
+            try:
+                mana_spend = int(self.var_mana_spend.get().strip())
+            except ValueError:
+                mana_spend = None
+
+        res = resolve_damage(attacker, defender, action, dmg_roll, mana_spend, glance_mult)
+        base_damage = res["base_damage"]
+        after_glance = res["after_glance"]
+        dr = res["dr"]
+        final = res["final"]
+
         log_parts = [f"{a_name} attacks {d_name} with {ref['name']}"]
+        if acc_info:
+            log_parts.append(acc_info)
 
         if kind == "item":
-            # PBD / Precision multiplier
-            total = base_damage
-            mult_info = ""
-            if ref.get("apply_bonus", True):
-                is_ranged = ref.get("is_ranged", False)
-                pts = attacker["stats"].get("precision" if is_ranged else "pbd", 0)
-                mult = mana_density_multiplier(pts)
-                total = int(math.floor(base_damage * mult))
-                mult_label = "Precision" if is_ranged else "PBD"
-                mult_info = f" * {mult_label} {mult:.2f}x"
-
-            # Apply glancing blow
-            after_glance = int(math.floor(total * glance_mult))
-
-            # Apply DR
-            dr = phys_dr_from_points(defender["stats"].get("phys_def", 0))
-            final = max(0, after_glance - dr)
-
-            detail = f"Base {base_damage} (roll {dmg_roll}+{flat_bonus}){mult_info}"
-            if glance_pct < 100:
-                detail += f" * Glancing {glance_pct}% = {after_glance}"
-            if dr > 0:
-                detail += f" - DR {dr}"
-            detail += f" = {final} damage"
-
-            log_parts.append(detail)
-            if acc_info:
-                log_parts.insert(1, acc_info)
-
-            # Apply damage to defender
-            defender["hp_current"] = max(0, defender["hp_current"] - final)
-            log_parts.append(f"{d_name} HP: {defender['hp_current']}/{defender['hp_max']}")
-
+            pieces = [f"Base {base_damage} (roll {dmg_roll}+{res['flat_bonus']})"]
+            if "mult" in res:
+                pieces.append(f" * {res['mult_label']} {res['mult']:.2f}x")
         else:
-            # Ability
-            slot = slot or "inner"
-            mods = ABILITY_MODS.get(slot, {"dmg": 1.0, "mana": 1.0})
-            dmg_mult = float(mods["dmg"])
-            mana_mult = float(mods["mana"])
-
-            base_cost = int(ref.get("mana_cost", 0) or 0)
-
-            # Mana spend
-            mana_spend_str = self.var_mana_spend.get().strip()
-            if mana_spend_str:
-                try:
-                    mana_spend = int(mana_spend_str)
-                except ValueError:
-                    mana_spend = base_cost
-            else:
-                mana_spend = base_cost
-
-            if mana_spend < base_cost:
-                mana_spend = base_cost
-
-            base_eff = int(math.ceil(base_cost * mana_mult))
-            spent_eff = int(math.ceil(mana_spend * mana_mult))
-
-            # Mana Density
-            md_pts = attacker["mana_density"]
-            md_mult = mana_density_multiplier(md_pts)
-
-            # Overcast
-            over = ref.get("overcast", {})
-            over_bonus = compute_overcast_bonus(base_eff, spent_eff, over)
-
-            raw_total = int(math.floor((base_damage + over_bonus) * dmg_mult * md_mult))
-
-            # Apply glancing blow
-            after_glance = int(math.floor(raw_total * glance_mult))
-
-            # Apply DR
-            dr = phys_dr_from_points(defender["stats"].get("phys_def", 0))
-            final = max(0, after_glance - dr)
-
-            detail = f"Base {base_damage}"
-            if over_bonus > 0:
-                detail += f" + Overcast {over_bonus}"
-            detail += f" * {slot} {dmg_mult:.2f}x * MD {md_mult:.2f}x = {raw_total}"
-            if glance_pct < 100:
-                detail += f" * Glancing {glance_pct}% = {after_glance}"
-            if dr > 0:
-                detail += f" - DR {dr}"
-            detail += f" = {final} damage"
-
-            log_parts.append(detail)
-            if acc_info:
-                log_parts.insert(1, acc_info)
-
+            pieces = [f"Base {base_damage}"]
+            if res["over_bonus"] > 0:
+                pieces.append(f" + Overcast {res['over_bonus']}")
+            pieces.append(f" * {res['slot']} {res['dmg_mult']:.2f}x * MD {res['md_mult']:.2f}x"
+                          f" = {res['total']}")
+        if glance_pct < 100:
+            pieces.append(f" * Glancing {glance_pct}% = {after_glance}")
+        if dr > 0:
+            pieces.append(f" - DR {dr}")
+        pieces.append(f" = {final} damage")
+        log_parts.append("".join(pieces))
+
+        if kind != "item":
             # Deduct mana from attacker
-            attacker["mana_current"] = max(0, attacker["mana_current"] - spent_eff)
-            log_parts.append(f"Mana spent: {spent_eff} (base {base_cost} * {mana_mult:.2f}x)")
+            spent_eff = res["spent_eff"]
+            a_res = attacker["res"]
+            a_res[MN_C] = max(0, a_res[MN_C] - spent_eff)
+            log_parts.append(f"Mana spent: {spent_eff} (base {res['base_cost']} * {res['mana_mult']:.2f}x)")
 
-            # Apply damage to defender
-            defender["hp_current"] = max(0, defender["hp_current"] - final)
-            log_parts.append(f"{d_name} HP: {defender['hp_current']}/{defender['hp_max']}")
+        # Apply damage to defender
+        d_res = defender["res"]
+        d_res[HP_C] = max(0, d_res[HP_C] - final)
+        hp_c, hp_m = d_res[HP_C], d_res[HP_M]
+        log_parts.append(f"{d_name} HP: {hp_c}/{hp_m}")
 
         # Log and update
         self._log(" | ".join(log_parts))
-        self.var_status.set(f"{d_name} took {final} damage. HP: {defender['hp_current']}/{defender['hp_max']}")
+        self.var_status.set(f"{d_name} took {final} damage. HP: {hp_c}/{hp_m}")
 
         # Update panels
         self._update_panel(self.panel_a, self.char_a)
         self._update_panel(self.panel_b, self.char_b)
 
+    # ---- Batch simulation ----
+
+    def _do_batch_sim(self):
+        attacker = self._get_attacker()
+        defender = self._get_defender()
+        action = self._get_selected_action()
+
+        if attacker is None or defender is None:
+            messagebox.showwarning("Battle Sim", "Load both characters first.")
+            return
+        if action is None:
+            messagebox.showwarning("Battle Sim", "Select an action from the list.")
+            return
+
+        mana_spend = None
+        if action["kind"] != "item":
+            try:
+                mana_spend = int(self.var_mana_spend.get().strip())
+            except ValueError:
+                mana_spend = None
+
+        results = simulate_batch(attacker, defender, action, BATCH_SIM_SIZE, mana_spend)
+        n = len(results)
+        misses = results.count(0)
+        avg = sum(results) / n
+
+        summary = (f"{attacker['name']} vs {defender['name']} with {action['ref']['name']}: "
+                   f"{n} simulated attacks | avg {avg:.1f} | min {min(results)} | "
+                   f"max {max(results)} | no damage {misses / n:.1%}")
+        self._log_many([summary] + format_damage_histogram(results))
+        self.var_status.set(f"Simulated {n} attacks: avg {avg:.1f} damage.")
+
     # ---- Refresh on tab switch ----
 
     def refresh(self):
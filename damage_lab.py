@@ -1,7 +1,9 @@
 # damage_lab.py
+import functools
 import math
 import re
 import tkinter as tk
+from dataclasses import dataclass
 from tkinter import ttk
 
 
@@ -18,6 +20,11 @@ TARGET_MULTS = {
     "Vulnerable (x2.0)": 2.0,
 }
 
+_DICE_RE = re.compile(r'(\d*)d(\d+)')
+_FLAT_RE = re.compile(r'([+-])(\d+)')
+_WS_TABLE = str.maketrans('', '', ' \t')
+
+@functools.lru_cache(maxsize=256)
 def parse_damage_expr(expr: str):
     """
     Parses: '1d10', '2d6+3', '3d8-2'
@@ -25,22 +32,38 @@ def parse_damage_expr(expr: str):
     """
     if not expr:
         return None
-    s = expr.replace(" ", "").lower()
-    m = re.search(r'(\d*)d(\d+)', s)
+    s = expr.translate(_WS_TABLE).lower()
+    m = _DICE_RE.search(s)
     if not m:
         return None
     dice_count = int(m.group(1)) if m.group(1) else 1
     die_size = int(m.group(2))
     flat_bonus = 0
     rest = s[m.end():]
-    for sign, num in re.findall(r'([+-])(\d+)', rest):
+    for sign, num in _FLAT_RE.findall(rest):
         flat_bonus += int(num) if sign == '+' else -int(num)
     return dice_count, die_size, flat_bonus
 
 
+_INV_LOG_100 = 1.0 / math.log(100.0)
+
+
 def clamp(x: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, x))
 
+def _md_slow(p: int) -> float:
+    if p <= 100:
+        return 1.0 + (p / 100.0)
+
+    return 2.0 + math.log(p * 0.01) * _INV_LOG_100
+
+
+# Sheet values are small non-negative ints; look those up instead of recomputing.
+_MD_LUT_SIZE = 4096
+_MD_LUT = tuple(_md_slow(i) for i in range(_MD_LUT_SIZE))
+_md_large = functools.lru_cache(maxsize=1024)(_md_slow)  # values past the table
+
+
 def mana_density_multiplier(points: int) -> float:
     try:
         p = int(points)
@@ -48,10 +71,9 @@ def mana_density_multiplier(points: int) -> float:
         p = 0
     p = max(0, p)
 
-    if p <= 100:
-        return 1.0 + (p / 100.0)
-
-    return 2.0 + (math.log(p / 100.0) / math.log(100.0))
+    if p < _MD_LUT_SIZE:
+        return _MD_LUT[p]
+    return _md_large(p)
 
 def max_pbd_factor_for_die(die_size: int) -> float:
     """
@@ -61,27 +83,19 @@ def max_pbd_factor_for_die(die_size: int) -> float:
       d20 -> 2.111... (so 18/20 -> ~1.9x)
     Interpolates for others.
     """
-    anchors = [(4, 0.50), (10, 1.00), (20, 2.1111111111)]
-    if die_size <= anchors[0][0]:
-        return anchors[0][1]
-    if die_size >= anchors[-1][0]:
-        return anchors[-1][1]
-    for (d0, f0), (d1, f1) in zip(anchors, anchors[1:]):
-        if d0 <= die_size <= d1:
-            t = (die_size - d0) / (d1 - d0)
-            return f0 + t * (f1 - f0)
-    return 1.0
+    if die_size <= 4:
+        return 0.50
+    if die_size >= 20:
+        return 2.1111111111
+    if die_size <= 10:
+        return 0.50 + ((die_size - 4) / 6) * (1.00 - 0.50)
+    return 1.00 + ((die_size - 10) / 10) * (2.1111111111 - 1.00)
 
 
-def compute_overcast_bonus(base_eff: int, spent_eff: int, over: dict) -> int:
-    """
-    log-ish scaling:
-      bonus = floor(scale * (log2(spent/base))^power), capped
-    """
-    if base_eff <= 0 or spent_eff <= base_eff:
-        return 0
+def _overcast_params(over: dict):
+    """Coerced (scale, power, cap) from an overcast dict, or None if it never adds damage."""
     if not isinstance(over, dict) or not over.get("enabled", False):
-        return 0
+        return None
 
     try:
         scale = int(over.get("scale", 0) or 0)
@@ -97,14 +111,132 @@ def compute_overcast_bonus(base_eff: int, spent_eff: int, over: dict) -> int:
         cap = 999
 
     if scale <= 0:
-        return 0
+        return None
+    return scale, power, cap
 
-    ratio = spent_eff / base_eff
-    x = math.log(ratio, 2.0)  # 1 at 2x, 2 at 4x, etc.
-    bonus = int(math.floor(scale * (x ** power)))
-    if cap >= 0:
-        bonus = min(bonus, cap)
-    return max(0, bonus)
+
+def compute_overcast_bonus(base_eff: int, spent_eff: int, over: dict) -> int:
+    """
+    log-ish scaling:
+      bonus = floor(scale * (log2(spent/base))^power), capped
+    """
+    if base_eff <= 0 or spent_eff <= base_eff:
+        return 0
+    return compute_overcast_bonus_curve(base_eff, (spent_eff,), over)[0]
+
+
+def compute_overcast_bonus_curve(base_eff: int, spent_effs, over: dict) -> list:
+    """compute_overcast_bonus for every value in spent_effs, parsing `over` only once."""
+    params = _overcast_params(over) if base_eff > 0 else None
+    return _overcast_curve(base_eff, spent_effs, params)
+
+
+def _overcast_curve(base_eff: int, spent_effs, params) -> list:
+    if params is None:
+        return [0] * len(spent_effs)
+    scale, power, cap = params
+
+    log2, floor = math.log2, math.floor
+    out = []
+    for spent_eff in spent_effs:
+        if spent_eff <= base_eff:
+            out.append(0)
+            continue
+        x = log2(spent_eff / base_eff)  # 1 at 2x, 2 at 4x, etc.
+        bonus = int(floor(scale * (x ** power)))
+        if cap >= 0:
+            bonus = min(bonus, cap)
+        out.append(max(0, bonus))
+    return out
+
+
+@dataclass(frozen=True, slots=True)
+class _PlotContext:
+    """Everything about the selected action + UI state that is fixed for one plot/test."""
+    kind: str
+    dice_count: int
+    die_size: int
+    flat_bonus: int
+    item_mult: float | None = None  # items: PBD/Precision multiplier, None if not applied
+    dmg_mult: float = 1.0           # abilities: slot damage multiplier
+    mana_mult: float = 1.0          # abilities: slot mana multiplier
+    md_mult: float = 1.0
+    base_cost: int = 0
+    base_eff: int = 0
+    over: tuple | None = None       # coerced (scale, power, cap), None if no overcast
+    target_mult: float = 1.0
+    target_num: int = 1             # target_mult == target_num / 2**target_shift, exactly
+    target_shift: int = 0
+    crit_shift: int = 0             # crit doubles: << 1
+
+
+def _dyadic(mult: float) -> tuple:
+    """float -> (num, shift) with mult == num / 2**shift (true for every finite float)."""
+    num, den = mult.as_integer_ratio()
+    return num, den.bit_length() - 1
+
+
+def _damage_curve(ctx: _PlotContext, rolls, spends, fuse: bool = False) -> list:
+    """
+    Final damage for each (rolled_total, mana_spend_base) pair under ctx.
+    fuse=True folds the item PBD/Precision and target multipliers into one floor;
+    that can read up to 1 higher per sample (before crit), fine for a graph only.
+    Every multiplier is positive, so a non-positive running total is 0 damage and
+    skips the remaining float work.
+    """
+    floor = math.floor
+    flat_bonus = ctx.flat_bonus
+
+    if fuse and ctx.kind == "item":
+        combined = ctx.target_mult if ctx.item_mult is None else ctx.item_mult * ctx.target_mult
+        crit_shift = ctx.crit_shift
+        bases = [int(r) + flat_bonus for r in rolls]
+        return [int(floor(b * combined)) << crit_shift if b > 0 else 0 for b in bases]
+
+    # Items: apply PBD/Precision as multiplier (same formula as mana density)
+    if ctx.kind == "item":
+        totals = [int(r) + flat_bonus for r in rolls]
+        mult = ctx.item_mult
+        if mult is not None:
+            totals = [int(floor(b * mult)) if b > 0 else 0 for b in totals]
+    else:
+        # Abilities: NO PBD. Apply slot multipliers + overcast
+        if ctx.base_cost <= 0:
+            return [0] * len(rolls)
+        return _ability_curve(ctx, rolls, spends)
+
+    # Target multiplier (resist/weak/vuln), then crit doubles total. Totals are ints and
+    # the target multipliers are dyadic, so floor(t * mult) is an exact shift.
+    num, shift, crit_shift = ctx.target_num, ctx.target_shift, ctx.crit_shift
+    return [((t * num) >> shift) << crit_shift if t > 0 else 0 for t in totals]
+
+
+def _ability_curve(ctx: _PlotContext, rolls, spends) -> list:
+    """
+    Ability branch of _damage_curve: spend -> effective mana -> overcast (via
+    _overcast_curve, shared with compute_overcast_bonus) -> slot/MD multipliers ->
+    target/crit per sample, with every ctx field in a local.
+    """
+    floor, ceil = math.floor, math.ceil
+    flat_bonus, base_cost = ctx.flat_bonus, ctx.base_cost
+    mana_mult, dmg_mult, md_mult = ctx.mana_mult, ctx.dmg_mult, ctx.md_mult
+    num, shift, crit_shift = ctx.target_num, ctx.target_shift, ctx.crit_shift
+    if ctx.over is not None:
+        spent_effs = [int(ceil(max(spend, base_cost) * mana_mult)) for spend in spends]
+        bonuses = _overcast_curve(ctx.base_eff, spent_effs, ctx.over)
+    else:
+        bonuses = [0] * len(rolls)
+
+    out = []
+    append = out.append
+    for r, bonus in zip(rolls, bonuses):
+        t = int(r) + flat_bonus + bonus
+        if t <= 0:
+            append(0)
+            continue
+        t = int(floor(t * dmg_mult * md_mult))
+        append(((t * num) >> shift) << crit_shift)
+    return out
 
 
 class DamageLabTab(ttk.Frame):
@@ -116,6 +248,9 @@ class DamageLabTab(ttk.Frame):
       get_pbd(): returns current PBD int from app
       get_precision(): returns current Precision int from app
     """
+    # Plot item curves with a single fused floor (see _damage_curve); "Compute 1 test" stays exact.
+    _FUSE_FLOORS = True
+
     def __init__(self, parent, get_actions, get_pbd, get_mana_density, get_precision=None):
         super().__init__(parent)
         self.get_actions = get_actions
@@ -145,6 +280,10 @@ class DamageLabTab(ttk.Frame):
         # Theme colors (set by parent via apply_theme)
         self._colors = None
 
+        # Pending debounced plot (Tk after id), and the last curve computed: (key, ys)
+        self._plot_after_id = None
+        self._last_curve = None
+
         self._build_ui()
         self.refresh_actions()
 
@@ -230,6 +369,9 @@ class DamageLabTab(ttk.Frame):
 
         self.canvas = tk.Canvas(canvas_frame, height=320)
         self.canvas.pack(fill=tk.BOTH, expand=True)
+        self._cv_items = {}  # persistent graph items, reused across redraws
+        # Re-layout on resize; debounced, and the curve itself comes from _last_curve.
+        self.canvas.bind("<Configure>", lambda _e: self.plot() if self.selected_ref is not None else None)
 
     # ---------- Theme ----------
     def apply_theme(self, colors: dict):
@@ -291,31 +433,20 @@ class DamageLabTab(ttk.Frame):
 
     # ---------- Core compute ----------
     def _get_target_mult(self) -> float:
-        return float(TARGET_MULTS.get(self.var_target_mult.get(), 1.0))
+        return TARGET_MULTS.get(self.var_target_mult.get(), 1.0)
 
-    def _get_pbd_value(self) -> int:
+    def _get_bonus_points(self, is_ranged: bool) -> int:
+        """Override entry if it holds a number, else the sheet's Precision (ranged) or PBD."""
         s = self.var_pbd_override.get().strip()
         if s:
             try:
                 return int(s)
             except ValueError:
-                return self.get_pbd()
-        return self.get_pbd()
-
-    def _get_precision_value(self) -> int:
-        s = self.var_pbd_override.get().strip()
-        if s:
-            try:
-                return int(s)
-            except ValueError:
-                return self.get_precision()
-        return self.get_precision()
-
-    def _compute_damage(self, rolled_total: int, mana_spend_base: int) -> int:
-        """Returns final damage after modifiers."""
-        if self.selected_ref is None:
-            return 0
+                pass
+        return self.get_precision() if is_ranged else self.get_pbd()
 
+    def _build_ctx(self) -> _PlotContext:
+        """Resolve the selected action and UI state once for a plot or test."""
         ref = self.selected_ref
         dmg_expr = (ref.get("damage") or "").strip()
         parsed = parse_damage_expr(dmg_expr)
@@ -324,59 +455,86 @@ class DamageLabTab(ttk.Frame):
         else:
             dice_count, die_size, flat_bonus = parsed
 
-        base = int(rolled_total) + int(flat_bonus)
+        target_mult = self._get_target_mult()
+        target_num, target_shift = _dyadic(target_mult)
+        common = dict(
+            dice_count=dice_count, die_size=die_size, flat_bonus=int(flat_bonus),
+            target_mult=target_mult, target_num=target_num, target_shift=target_shift,
+            crit_shift=1 if self.var_crit.get() else 0,
+        )
 
-        # Items: apply PBD/Precision as multiplier (same formula as mana density)
         if self.selected_kind == "item":
-            total = base
-            if bool(ref.get("apply_bonus", ref.get("apply_pbd", True))):
+            item_mult = None
+            apply_bonus = ref["apply_bonus"] if "apply_bonus" in ref else ref.get("apply_pbd", True)
+            if bool(apply_bonus):
                 is_ranged = bool(ref.get("is_ranged", False))
-                pts = self._get_precision_value() if is_ranged else self._get_pbd_value()
-                mult = mana_density_multiplier(pts)
-                total = int(math.floor(base * mult))
-        else:
-            # Abilities: NO PBD. Apply slot multipliers + overcast
-            slot = self.selected_slot or "inner"
-            mods = ABILITY_MODS.get(slot, {"dmg": 1.0, "mana": 1.0})
-            dmg_mult = float(mods["dmg"])
-            mana_mult = float(mods["mana"])
+                pts = self._get_bonus_points(is_ranged)
+                item_mult = mana_density_multiplier(pts)
+            return _PlotContext(kind="item", item_mult=item_mult, **common)
 
-            base_cost = int(ref.get("mana_cost", 0) or 0)
-            if base_cost <= 0:
-                return 0
+        slot = self.selected_slot or "inner"
+        mods = ABILITY_MODS.get(slot, {"dmg": 1.0, "mana": 1.0})
+        dmg_mult = float(mods["dmg"])
+        mana_mult = float(mods["mana"])
 
-            if mana_spend_base < base_cost:
-                mana_spend_base = base_cost
+        base_cost = int(ref.get("mana_cost", 0) or 0)
+        if base_cost <= 0:
+            return _PlotContext(kind="ability", base_cost=base_cost, **common)
 
-            base_eff = int(math.ceil(base_cost * mana_mult))
-            spent_eff = int(math.ceil(mana_spend_base * mana_mult))
+        base_eff = int(math.ceil(base_cost * mana_mult))
+        md_pts = 0
+        try:
+            md_pts = int(self.get_mana_density() or 0)
+        except Exception:
             md_pts = 0
-            try:
-                md_pts = int(self.get_mana_density() or 0)
-            except Exception:
-                md_pts = 0
-            md_mult = mana_density_multiplier(md_pts)
-
-
-            over = ref.get("overcast", {}) if isinstance(ref.get("overcast", {}), dict) else {}
-            over_bonus = compute_overcast_bonus(base_eff, spent_eff, over)
-
-            total = int(math.floor((base + over_bonus) * dmg_mult * md_mult))
+        md_mult = mana_density_multiplier(md_pts)
 
+        # _overcast_params treats a missing / non-dict overcast as "no overcast"
+        over = ref.get("overcast")
 
-        # Target multiplier (resist/weak/vuln)
-        total = int(math.floor(total * self._get_target_mult()))
-
-        # Crit doubles total
-        if self.var_crit.get():
-            total *= 2
+        return _PlotContext(
+            kind="ability", dmg_mult=dmg_mult, mana_mult=mana_mult, md_mult=md_mult,
+            base_cost=base_cost, base_eff=base_eff,
+            over=_overcast_params(over) if base_eff > 0 else None,
+            **common,
+        )
 
-        return max(0, total)
+    def _compute_damage(self, rolled_total: int, mana_spend_base: int) -> int:
+        """Returns final damage after modifiers."""
+        if self.selected_ref is None:
+            return 0
+        return _damage_curve(self._build_ctx(), (rolled_total,), (mana_spend_base,))[0]
 
     # ---------- Plot helpers ----------
+    def _canvas_reset(self):
+        """Wipe the canvas, including the persistent graph items."""
+        self.canvas.delete("all")
+        self._cv_items.clear()
+
+    def _canvas_item(self, key, create, coords, static=None, **opts):
+        """
+        Create the graph item `key` on first use; afterwards only push the coords/options
+        that changed since the last redraw. `static` options (font, anchor, ...) are
+        creation-only.
+        """
+        coords = tuple(coords)
+        prev = self._cv_items.get(key)
+        if prev is None:
+            item = create(*coords, **(static or {}), **opts)
+            self._cv_items[key] = (item, coords, opts)
+            return
+        item, prev_coords, prev_opts = prev
+        if coords == prev_coords and opts == prev_opts:
+            return
+        c = self.canvas
+        if coords != prev_coords:
+            c.coords(item, *coords)
+        if opts != prev_opts:
+            c.itemconfigure(item, **opts)
+        self._cv_items[key] = (item, coords, opts)
+
     def _canvas_plot_line(self, xs, ys, title: str, xlabel: str, ylabel: str):
         c = self.canvas
-        c.delete("all")
 
         # Theme-aware colors
         fg = self._colors["canvas_fg"] if self._colors else "black"
@@ -391,6 +549,7 @@ class DamageLabTab(ttk.Frame):
         plot_h = max(1, h - mt - mb)
 
         if not xs or not ys or len(xs) != len(ys):
+            self._canvas_reset()
             c.create_text(w // 2, h // 2, text="No data to plot.", fill=fg)
             return
 
@@ -405,39 +564,62 @@ class DamageLabTab(ttk.Frame):
         # padding
         y_max = int(math.ceil(y_max * 1.10))
 
+        if not self._cv_items:
+            c.delete("all")  # drop any placeholder message before the graph items are built
+
         def x_to_px(x):
             return ml + (x - x_min) * plot_w / (x_max - x_min)
 
         def y_to_px(y):
             return mt + (y_max - y) * plot_h / (y_max - y_min)
 
+        line, text = c.create_line, c.create_text
+        tick_font = {"font": ("Segoe UI", 9)}
+
         # axes
-        c.create_line(ml, mt, ml, mt + plot_h, fill=fg)                  # y-axis
-        c.create_line(ml, mt + plot_h, ml + plot_w, mt + plot_h, fill=fg) # x-axis
+        self._canvas_item("y_axis", line, (ml, mt, ml, mt + plot_h), fill=fg)
+        self._canvas_item("x_axis", line, (ml, mt + plot_h, ml + plot_w, mt + plot_h), fill=fg)
 
         # ticks
         for i in range(6):
             tx = x_min + (x_max - x_min) * i / 5
             px = x_to_px(tx)
-            c.create_line(px, mt + plot_h, px, mt + plot_h + 5, fill=fg)
-            c.create_text(px, mt + plot_h + 18, text=str(int(round(tx))), font=("Segoe UI", 9), fill=fg)
+            self._canvas_item(("x_tick", i), line, (px, mt + plot_h, px, mt + plot_h + 5), fill=fg)
+            self._canvas_item(("x_tick_label", i), text, (px, mt + plot_h + 18), static=tick_font,
+                              text=str(int(round(tx))), fill=fg)
 
         for i in range(6):
             ty = y_min + (y_max - y_min) * i / 5
             py = y_to_px(ty)
-            c.create_line(ml - 5, py, ml, py, fill=fg)
-            c.create_text(ml - 12, py, text=str(int(round(ty))), anchor="e", font=("Segoe UI", 9), fill=fg)
+            self._canvas_item(("y_tick", i), line, (ml - 5, py, ml, py), fill=fg)
+            self._canvas_item(("y_tick_label", i), text, (ml - 12, py), static=dict(tick_font, anchor="e"),
+                              text=str(int(round(ty))), fill=fg)
 
         # labels
-        c.create_text(w // 2, 14, text=title, font=("Segoe UI", 11, "bold"), fill=fg)
-        c.create_text(w // 2, h - 18, text=xlabel, font=("Segoe UI", 10), fill=fg)
-        c.create_text(18, h // 2, text=ylabel, angle=90, font=("Segoe UI", 10), fill=fg)
-
-        # polyline
-        pts = []
-        for x, y in zip(xs, ys):
-            pts.extend([x_to_px(x), y_to_px(y)])
-        c.create_line(*pts, width=2, fill=line_color)
+        self._canvas_item("title", text, (w // 2, 14), static={"font": ("Segoe UI", 11, "bold")},
+                          text=title, fill=fg)
+        self._canvas_item("xlabel", text, (w // 2, h - 18), static={"font": ("Segoe UI", 10)},
+                          text=xlabel, fill=fg)
+        self._canvas_item("ylabel", text, (18, h // 2), static={"angle": 90, "font": ("Segoe UI", 10)},
+                          text=ylabel, fill=fg)
+
+        # More samples than horizontal pixels just costs Tk segments; keep every k-th one
+        # (plus the last, so the curve still reaches the right edge).
+        n = len(xs)
+        if n > plot_w:
+            stride = int(math.ceil(n / plot_w))
+            tail = (xs[-1], ys[-1]) if (n - 1) % stride else None
+            xs, ys = xs[::stride], ys[::stride]
+            if tail is not None:
+                xs = [*xs, tail[0]]
+                ys = [*ys, tail[1]]
+
+        # polyline: interleaved x0, y0, x1, y1, ... written into a preallocated buffer
+        x_span, y_span = x_max - x_min, y_max - y_min
+        pts = [0.0] * (2 * len(xs))
+        pts[0::2] = [ml + (x - x_min) * plot_w / x_span for x in xs]
+        pts[1::2] = [mt + (y_max - y) * plot_h / y_span for y in ys]
+        self._canvas_item("curve", line, pts, static={"width": 2}, fill=line_color)
 
     def compute_one(self):
         if self.selected_ref is None:
@@ -451,15 +633,9 @@ class DamageLabTab(ttk.Frame):
             rolled = None
 
         # if no custom roll, use average
-        ref = self.selected_ref
-        parsed = parse_damage_expr((ref.get("damage") or "").strip())
-        if parsed is None:
-            dice_count, die_size, flat_bonus = (1, 10, 0)
-        else:
-            dice_count, die_size, flat_bonus = parsed
-
+        ctx = self._build_ctx()
         if rolled is None:
-            rolled = int(round(dice_count * (die_size + 1) / 2.0))
+            rolled = int(round(ctx.dice_count * (ctx.die_size + 1) / 2.0))
 
         # mana
         try:
@@ -467,20 +643,34 @@ class DamageLabTab(ttk.Frame):
         except ValueError:
             mana_spend = 0
 
-        dmg = self._compute_damage(rolled, mana_spend)
+        dmg = _damage_curve(ctx, (rolled,), (mana_spend,))[0]
         self.var_info.set(f"Test: rolled={rolled}, mana={mana_spend} → damage={dmg}")
 
-    def plot(self):
+    def _schedule_plot(self, delay_ms: int = 40):
+        """Coalesce bursts of plot requests (list scrolling, theme changes) into one redraw."""
+        if self._plot_after_id is not None:
+            self.after_cancel(self._plot_after_id)
+        self._plot_after_id = self.after(delay_ms, self._do_plot)
+
+    plot = _schedule_plot
+
+    def _curve_for(self, ctx: _PlotContext, key, rolls, spends) -> list:
+        """_damage_curve, skipped when the inputs match the last plot (re-theme, repeat clicks)."""
+        key = (ctx, key)
+        if self._last_curve is not None and self._last_curve[0] == key:
+            return self._last_curve[1]
+        ys = _damage_curve(ctx, rolls, spends, fuse=self._FUSE_FLOORS)
+        self._last_curve = (key, ys)
+        return ys
+
+    def _do_plot(self):
+        self._plot_after_id = None
         if self.selected_ref is None:
             return
 
         ref = self.selected_ref
-        dmg_expr = (ref.get("damage") or "").strip()
-        parsed = parse_damage_expr(dmg_expr)
-        if parsed is None:
-            dice_count, die_size, flat_bonus = (1, 10, 0)
-        else:
-            dice_count, die_size, flat_bonus = parsed
+        ctx = self._build_ctx()
+        dice_count, die_size = ctx.dice_count, ctx.die_size
 
         mode = self.var_mode.get()
 
@@ -495,9 +685,8 @@ class DamageLabTab(ttk.Frame):
 
             max_roll = max(1, dice_count * die_size)
             xs = list(range(0, max_roll + 1))
-            ys = [self._compute_damage(x + flat_bonus, mana_spend) for x in xs]  # note: rolled_total is dice sum; flat already added inside compute via expr parse, so pass dice sum only
-            # Actually compute expects rolled_total as dice sum; it adds flat_bonus internally.
-            ys = [self._compute_damage(x, mana_spend) for x in xs]
+            # rolled_total is the dice sum; the curve adds flat_bonus itself
+            ys = self._curve_for(ctx, ("roll", max_roll, mana_spend), xs, [mana_spend] * len(xs))
 
             title = f"{ref.get('name','(unnamed)')} — vs Roll"
             self._canvas_plot_line(xs, ys, title, "Dice Sum (rolled)", "Damage")
@@ -505,7 +694,7 @@ class DamageLabTab(ttk.Frame):
         else:
             # Damage vs Mana (abilities only)
             if self.selected_kind != "ability":
-                self.canvas.delete("all")
+                self._canvas_reset()
                 _fg = self._colors["canvas_fg"] if self._colors else "black"
                 self.canvas.create_text(
                     10, 10, anchor="nw", fill=_fg,
@@ -535,11 +724,8 @@ class DamageLabTab(ttk.Frame):
             else:
                 rolled = int(round(dice_count * (die_size + 1) / 2.0))
 
-            xs = []
-            ys = []
-            for spend in range(base_cost, base_cost * mx + 1):
-                xs.append(spend)
-                ys.append(self._compute_damage(rolled, spend))
+            xs = list(range(base_cost, base_cost * mx + 1))
+            ys = self._curve_for(ctx, ("mana", base_cost, mx, rolled), [rolled] * len(xs), xs)
 
             title = f"{ref.get('name','(unnamed)')} — vs Mana (roll={roll_profile})"
             self._canvas_plot_line(xs, ys, title, "Mana Spend (base)", "Damage")
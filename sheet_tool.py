@@ -1,12 +1,22 @@
 # character_sheet.py
+import functools
+import hashlib
 import json
 import math
 import os
+import queue
 import random
 import re
+import secrets
 import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 # When running as a frozen PyInstaller GUI app (console=False),
 # stdout/stderr are None which causes print() to crash.
@@ -68,29 +78,37 @@ LIGHT_COLORS = {
 PREFS_PATH = Path(os.path.expanduser("~")) / ".homebrew_sheet_prefs.json"
 
 
+_PREFS_CACHE = None
+
+
 def load_prefs() -> dict:
     """Load all preferences from disk. Returns dict with defaults for missing keys."""
-    defaults = {"dark_mode": False, "ui_scale": 1.0}
-    try:
-        with open(PREFS_PATH, "r") as f:
-            saved = json.load(f)
-        for k, v in defaults.items():
-            if k not in saved:
-                saved[k] = v
-        return saved
-    except Exception:
-        return dict(defaults)
+    global _PREFS_CACHE
+    if _PREFS_CACHE is None:
+        defaults = {"dark_mode": False, "ui_scale": 1.0}
+        try:
+            saved = json.loads(PREFS_PATH.read_text())
+            for k, v in defaults.items():
+                if k not in saved:
+                    saved[k] = v
+            _PREFS_CACHE = saved
+        except (OSError, ValueError, TypeError):
+            _PREFS_CACHE = defaults
+    return dict(_PREFS_CACHE)
 
 
 def save_prefs(prefs: dict):
+    global _PREFS_CACHE
+    _PREFS_CACHE = dict(prefs)
     try:
-        with open(PREFS_PATH, "w") as f:
-            json.dump(prefs, f)
-    except Exception:
+        PREFS_PATH.write_text(json.dumps(prefs))
+    except (OSError, TypeError, ValueError):
         pass
 
 
 def load_theme_pref() -> bool:
+    if _PREFS_CACHE is not None:
+        return _PREFS_CACHE.get("dark_mode", False)
     return load_prefs().get("dark_mode", False)
 
 
@@ -100,52 +118,54 @@ def save_theme_pref(dark: bool):
     save_prefs(prefs)
 
 
+# (style name, {option: color key}) applied by apply_ttk_theme.
+_STYLE_SPECS = (
+    ("TFrame", {"background": "bg"}),
+    ("TLabel", {"background": "bg", "foreground": "fg"}),
+    ("TLabelframe", {"background": "labelframe_bg", "foreground": "fg"}),
+    ("TLabelframe.Label", {"background": "labelframe_bg", "foreground": "fg"}),
+    ("TButton", {"background": "button_bg", "foreground": "fg"}),
+    ("TEntry", {"fieldbackground": "entry_bg", "foreground": "entry_fg", "insertcolor": "fg"}),
+    ("TCombobox", {"fieldbackground": "entry_bg", "foreground": "entry_fg",
+                   "selectbackground": "select_bg", "selectforeground": "select_fg"}),
+    ("TCheckbutton", {"background": "bg", "foreground": "fg"}),
+    ("TNotebook", {"background": "bg"}),
+    ("TNotebook.Tab", {"background": "tab_bg", "foreground": "fg"}),
+    ("TSeparator", {"background": "gray"}),
+    ("TScrollbar", {"background": "button_bg", "troughcolor": "bg"}),
+    # Special named styles for gray/red info labels
+    ("Gray.TLabel", {"background": "bg", "foreground": "gray"}),
+    ("Red.TLabel", {"background": "bg", "foreground": "red"}),
+    ("Green.TLabel", {"background": "bg", "foreground": "green"}),
+)
+
+# (style name, {option: ((state, color key), ...)}) state maps.
+_STYLE_MAPS = (
+    ("TButton", {"background": (("active", "accent"),), "foreground": (("active", "select_fg"),)}),
+    ("TCombobox", {"fieldbackground": (("readonly", "entry_bg"),), "foreground": (("readonly", "entry_fg"),)}),
+    ("TCheckbutton", {"background": (("active", "bg"),)}),
+    ("TNotebook.Tab", {"background": (("selected", "tab_selected"),), "foreground": (("selected", "fg"),)}),
+)
+
+
 def apply_ttk_theme(style: ttk.Style, colors: dict):
-    """Configure the ttk Style object for all widget types."""
+    """Configure the ttk Style object for all widget types.
+    No-op if this same colors dict was the last one applied to `style`."""
+    if getattr(style, "_applied_colors", None) is colors:
+        return
+
     style.theme_use("clam")
 
-    style.configure("TFrame", background=colors["bg"])
-    style.configure("TLabel", background=colors["bg"], foreground=colors["fg"])
-    style.configure("TLabelframe", background=colors["labelframe_bg"],
-                     foreground=colors["fg"])
-    style.configure("TLabelframe.Label", background=colors["labelframe_bg"],
-                     foreground=colors["fg"])
-    style.configure("TButton", background=colors["button_bg"],
-                     foreground=colors["fg"])
-    style.map("TButton",
-              background=[("active", colors["accent"])],
-              foreground=[("active", colors["select_fg"])])
-    style.configure("TEntry", fieldbackground=colors["entry_bg"],
-                     foreground=colors["entry_fg"],
-                     insertcolor=colors["fg"])
-    style.configure("TCombobox", fieldbackground=colors["entry_bg"],
-                     foreground=colors["entry_fg"],
-                     selectbackground=colors["select_bg"],
-                     selectforeground=colors["select_fg"])
-    style.map("TCombobox",
-              fieldbackground=[("readonly", colors["entry_bg"])],
-              foreground=[("readonly", colors["entry_fg"])])
-    style.configure("TCheckbutton", background=colors["bg"],
-                     foreground=colors["fg"])
-    style.map("TCheckbutton",
-              background=[("active", colors["bg"])])
-    style.configure("TNotebook", background=colors["bg"])
-    style.configure("TNotebook.Tab", background=colors["tab_bg"],
-                     foreground=colors["fg"], padding=[8, 4])
-    style.map("TNotebook.Tab",
-              background=[("selected", colors["tab_selected"])],
-              foreground=[("selected", colors["fg"])])
-    style.configure("TSeparator", background=colors["gray"])
-    style.configure("TScrollbar", background=colors["button_bg"],
-                     troughcolor=colors["bg"])
+    c = dict(colors)
+    c.setdefault("green", colors["fg"])
+    for name, spec in _STYLE_SPECS:
+        style.configure(name, **{opt: c[key] for opt, key in spec.items()})
+    style.configure("TNotebook.Tab", padding=[8, 4])
+    for name, spec in _STYLE_MAPS:
+        style.map(name, **{opt: [(state, c[key]) for state, key in states]
+                           for opt, states in spec.items()})
 
-    # Special named styles for gray/red info labels
-    style.configure("Gray.TLabel", background=colors["bg"],
-                     foreground=colors["gray"])
-    style.configure("Red.TLabel", background=colors["bg"],
-                     foreground=colors["red"])
-    style.configure("Green.TLabel", background=colors["bg"],
-                     foreground=colors.get("green", colors["fg"]))
+    style._applied_colors = colors
 
 
 def style_tk_widget(widget, colors: dict):
@@ -180,8 +200,90 @@ except ImportError:
     OLLAMA_AVAILABLE = False
     print("Warning: ollama package not found. Spell generation will use template-based fallback.")
 
+# Upgrades are short rewrites of one spell, so a smaller model answers them faster.
+GEN_MODEL = os.environ.get("MWCS_GEN_MODEL", "gemma3:4b")
+UPGRADE_MODEL = os.environ.get("MWCS_UPGRADE_MODEL", "gemma3:1b")
+OLLAMA_KEEP_ALIVE = "30m"  # keep the model resident between clicks
+_OLLAMA_CLIENT = None
+_OLLAMA_WARMED = False
+
+
+def _get_ollama():
+    """Shared Ollama client, created on first use so its HTTP connection is reused."""
+    global _OLLAMA_CLIENT
+    if _OLLAMA_CLIENT is None:
+        _OLLAMA_CLIENT = ollama.Client()
+    return _OLLAMA_CLIENT
+
+
+def warm_up_ollama():
+    """Load GEN_MODEL in the background so the first spell generation skips the cold start."""
+    global _OLLAMA_WARMED
+    if not OLLAMA_AVAILABLE or _OLLAMA_WARMED:
+        return
+    _OLLAMA_WARMED = True
+
+    def _warm():
+        try:
+            # An empty prompt just loads the model; nothing is generated.
+            _get_ollama().generate(model=GEN_MODEL, prompt="", options={"num_predict": 1},
+                                   keep_alive=OLLAMA_KEEP_ALIVE)
+        except Exception as e:
+            print(f"Warning: Ollama warm-up failed: {e}")
+
+    threading.Thread(target=_warm, daemon=True).start()
+
+# orjson (optional) loads/saves large character files several times faster.
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dump_bytes(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+    def _json_dump_compact(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS)
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dump_bytes(obj) -> bytes:
+        return json.dumps(obj, indent=2, separators=(",", ": "), ensure_ascii=False).encode("utf-8")
+
+    # No indent keeps the stdlib on its C encoder; used where output is never read.
+    # Keys are sorted so re-inserting a key doesn't change the snapshot.
+    _COMPACT_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, check_circular=False,
+                                        sort_keys=True)
+
+    def _json_dump_compact(obj) -> bytes:
+        return _COMPACT_ENCODER.encode(obj).encode("utf-8", "surrogatepass")
+
+# xxhash (optional) digests snapshots faster than hashlib's BLAKE2b.
+try:
+    import xxhash
+
+    def _digest16(data: bytes) -> bytes:
+        return xxhash.xxh3_128_digest(data)
+except ImportError:
+    def _digest16(data: bytes) -> bytes:
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _write_bytes_atomic(path: Path, data: bytes) -> None:
+    """Write via a temp file + os.replace so a crash never leaves half-written JSON."""
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
 from damage_lab import DamageLabTab
-from battle_sim import BattleSimTab, build_sim_character
+from battle_sim import (BattleSimTab, build_sim_character, slot_index, accuracy_source, sim_resources,
+                        sim_stats)
 
 # ---------------- File picking ----------------
 
@@ -225,85 +327,77 @@ def load_character(path: Path):
     if not path or not path.exists():
         messagebox.showerror("Error", f"Character file not found: {path}")
         raise SystemExit(1)
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return _json_loads(path.read_bytes())
 
 
 def save_character(char, path: Path):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(char, f, indent=2)
+    Path(path).write_bytes(_json_dump_bytes(char))
 
 
 # ---------------- Mechanics helpers ----------------
 
 ROLL_TYPES = ["None", "Attack", "Save", "Check"]
 
+AbilityMods = namedtuple("AbilityMods", "dmg mana")
+
 ABILITY_MODS = {
-    "core":    {"dmg": 1.50, "mana": 0.75},
-    "inner":   {"dmg": 1.00, "mana": 1.00},
-    "outer":   {"dmg": 0.75, "mana": 2.00},
-    "learned": {"dmg": 1.00, "mana": 1.00},  # same multipliers as inner; no slot cap
+    "core":    AbilityMods(dmg=1.50, mana=0.75),
+    "inner":   AbilityMods(dmg=1.00, mana=1.00),
+    "outer":   AbilityMods(dmg=0.75, mana=2.00),
+    "learned": AbilityMods(dmg=1.00, mana=1.00),  # same multipliers as inner; no slot cap
 }
+NEUTRAL_ABILITY_MODS = AbilityMods(dmg=1.0, mana=1.0)
 
 # -------- Spell Generation System --------
 
+Archetype = namedtuple("Archetype", "roll_types power_weight mana_weight")
+
 SPELL_ARCHETYPES = {
-    "offensive": {
-        "roll_types": ["Attack", "Save"],
-        "power_weight": 1.0,
-        "mana_weight": 1.0,
-    },
-    "defensive": {
-        "roll_types": ["None"],
-        "power_weight": 0.6,
-        "mana_weight": 0.8,
-    },
-    "utility": {
-        "roll_types": ["None", "Check"],
-        "power_weight": 0.4,
-        "mana_weight": 0.7,
-    },
-    "buff": {
-        "roll_types": ["None"],
-        "power_weight": 0.7,
-        "mana_weight": 1.2,
-    },
-    "debuff": {
-        "roll_types": ["Save", "Check"],
-        "power_weight": 0.8,
-        "mana_weight": 0.9,
-    },
+    "offensive": Archetype(roll_types=("Attack", "Save"), power_weight=1.0, mana_weight=1.0),
+    "defensive": Archetype(roll_types=("None",), power_weight=0.6, mana_weight=0.8),
+    "utility":   Archetype(roll_types=("None", "Check"), power_weight=0.4, mana_weight=0.7),
+    "buff":      Archetype(roll_types=("None",), power_weight=0.7, mana_weight=1.2),
+    "debuff":    Archetype(roll_types=("Save", "Check"), power_weight=0.8, mana_weight=0.9),
 }
 
 SPELL_ELEMENTS = {
-    "fire": {"adjectives": ["Blazing", "Scorching", "Infernal", "Searing"], "nouns": ["Flame", "Ember", "Conflagration", "Pyre"]},
-    "ice": {"adjectives": ["Frozen", "Chilling", "Glacial", "Arctic"], "nouns": ["Frost", "Shard", "Blizzard", "Crystal"]},
-    "lightning": {"adjectives": ["Electric", "Thunderous", "Crackling", "Shocking"], "nouns": ["Bolt", "Storm", "Arc", "Spark"]},
-    "arcane": {"adjectives": ["Mystical", "Ethereal", "Eldritch", "Runic"], "nouns": ["Missile", "Orb", "Beam", "Pulse"]},
-    "shadow": {"adjectives": ["Dark", "Umbral", "Void", "Tenebrous"], "nouns": ["Shroud", "Tendril", "Veil", "Curse"]},
-    "light": {"adjectives": ["Radiant", "Holy", "Brilliant", "Sacred"], "nouns": ["Ray", "Lance", "Blessing", "Aura"]},
-    "nature": {"adjectives": ["Verdant", "Primal", "Wild", "Living"], "nouns": ["Vine", "Thorn", "Growth", "Wrath"]},
-    "force": {"adjectives": ["Telekinetic", "Kinetic", "Crushing", "Pushing"], "nouns": ["Blast", "Wave", "Hammer", "Shield"]},
-    "healing": {"adjectives": ["Soothing", "Regenerative", "Vital", "Mending"], "nouns": ["Touch", "Word", "Light", "Spring"]},
-    "psychic": {"adjectives": ["Mental", "Psionic", "Mind", "Cerebral"], "nouns": ["Blast", "Spike", "Whisper", "Scream"]},
+    "fire": {"adjectives": ("Blazing", "Scorching", "Infernal", "Searing"), "nouns": ("Flame", "Ember", "Conflagration", "Pyre")},
+    "ice": {"adjectives": ("Frozen", "Chilling", "Glacial", "Arctic"), "nouns": ("Frost", "Shard", "Blizzard", "Crystal")},
+    "lightning": {"adjectives": ("Electric", "Thunderous", "Crackling", "Shocking"), "nouns": ("Bolt", "Storm", "Arc", "Spark")},
+    "arcane": {"adjectives": ("Mystical", "Ethereal", "Eldritch", "Runic"), "nouns": ("Missile", "Orb", "Beam", "Pulse")},
+    "shadow": {"adjectives": ("Dark", "Umbral", "Void", "Tenebrous"), "nouns": ("Shroud", "Tendril", "Veil", "Curse")},
+    "light": {"adjectives": ("Radiant", "Holy", "Brilliant", "Sacred"), "nouns": ("Ray", "Lance", "Blessing", "Aura")},
+    "nature": {"adjectives": ("Verdant", "Primal", "Wild", "Living"), "nouns": ("Vine", "Thorn", "Growth", "Wrath")},
+    "force": {"adjectives": ("Telekinetic", "Kinetic", "Crushing", "Pushing"), "nouns": ("Blast", "Wave", "Hammer", "Shield")},
+    "healing": {"adjectives": ("Soothing", "Regenerative", "Vital", "Mending"), "nouns": ("Touch", "Word", "Light", "Spring")},
+    "psychic": {"adjectives": ("Mental", "Psionic", "Mind", "Cerebral"), "nouns": ("Blast", "Spike", "Whisper", "Scream")},
 }
 
 SPELL_ACTIONS = {
-    "offensive": ["Strike", "Blast", "Bolt", "Lance", "Storm", "Barrage", "Burst"],
-    "defensive": ["Shield", "Ward", "Barrier", "Wall", "Aegis", "Protection"],
-    "utility": ["Sense", "Detection", "Vision", "Manipulation", "Channel"],
-    "buff": ["Enhancement", "Empowerment", "Blessing", "Invigoration", "Fortification"],
-    "debuff": ["Curse", "Hex", "Bane", "Weakness", "Drain"],
+    "offensive": ("Strike", "Blast", "Bolt", "Lance", "Storm", "Barrage", "Burst"),
+    "defensive": ("Shield", "Ward", "Barrier", "Wall", "Aegis", "Protection"),
+    "utility": ("Sense", "Detection", "Vision", "Manipulation", "Channel"),
+    "buff": ("Enhancement", "Empowerment", "Blessing", "Invigoration", "Fortification"),
+    "debuff": ("Curse", "Hex", "Bane", "Weakness", "Drain"),
 }
 
+TierDice = namedtuple("TierDice", "min max count_range")
+
 TIER_DICE = {
-    "T1": {"min": 4, "max": 6, "count_range": (1, 2)},
-    "T2": {"min": 6, "max": 8, "count_range": (1, 3)},
-    "T3": {"min": 8, "max": 12, "count_range": (2, 4)},
-    "T4": {"min": 10, "max": 20, "count_range": (2, 5)},
+    "T1": TierDice(min=4, max=6, count_range=(1, 2)),
+    "T2": TierDice(min=6, max=8, count_range=(1, 3)),
+    "T3": TierDice(min=8, max=12, count_range=(2, 4)),
+    "T4": TierDice(min=10, max=20, count_range=(2, 5)),
 }
 
-DEFAULT_TIER_DICE = {"min": 4, "max": 6, "count_range": (1, 2)}
+DEFAULT_TIER_DICE = TierDice(min=4, max=6, count_range=(1, 2))
+
+DIE_SIZES = (4, 6, 8, 10, 12, 20)
+TIER_ALLOWED_DICE = {
+    tier: tuple(d for d in DIE_SIZES if info.min <= d <= info.max)
+    for tier, info in TIER_DICE.items()
+}
+DEFAULT_ALLOWED_DICE = tuple(d for d in DIE_SIZES if DEFAULT_TIER_DICE.min <= d <= DEFAULT_TIER_DICE.max)
 
 # ---------- Tier system (see Context/tier_rules.md) ----------
 # Active development scope: T1-T5. The world has up to 50 tiers, but no special
@@ -507,7 +601,7 @@ MOB_NAME_BASES = [
 MOB_COMBAT_TAGS = ["Melee", "Ranged", "Magic", "Support"]
 
 # ---------- New Stats (your list) ----------
-STAT_ORDER = [
+STAT_ORDER = (
     ("melee_acc",     "Melee Accuracy"),
     ("ranged_acc",    "Ranged Weapon Accuracy"),
     ("spellcraft",    "Spellcraft"),
@@ -522,8 +616,9 @@ STAT_ORDER = [
     ("utility",       "Utility"),
     ("agility",       "Agility"),
     ("strength",      "Strength"),
-]
-STAT_KEYS = [k for k, _ in STAT_ORDER]
+)
+STAT_KEYS = tuple(k for k, _ in STAT_ORDER)
+STAT_KEYS_SET = frozenset(STAT_KEYS)
 
 ARMOR_SLOTS = [
     "Head",
@@ -560,6 +655,35 @@ def clamp(x: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, x))
 
 
+def _as_int(v, default=0) -> int:
+    """int(v or default) without try/except on the common already-an-int path."""
+    if not v:
+        return default
+    if type(v) is int:
+        return v
+    try:
+        return int(v)
+    except (ValueError, TypeError, OverflowError):
+        return default
+
+
+def _as_float(v, default=0.0) -> float:
+    """float(v or default) without try/except on the common already-a-float path."""
+    if not v:
+        return default
+    if type(v) is float:
+        return v
+    try:
+        return float(v)
+    except (ValueError, TypeError, OverflowError):
+        return default
+
+
+_DICE_RE = re.compile(r'(\d*)d(\d+)')
+_SIGN_NUM_RE = re.compile(r'([+-])(\d+)')
+_WORD_RE = re.compile(r'\w+')
+
+
 def parse_damage_expr(expr: str):
     """
     Parses: '1d10', '2d6+3', '3d8-2'
@@ -568,18 +692,19 @@ def parse_damage_expr(expr: str):
     if not expr:
         return None
     s = expr.replace(" ", "").lower()
-    m = re.search(r'(\d*)d(\d+)', s)
+    m = _DICE_RE.search(s)
     if not m:
         return None
     dice_count = int(m.group(1)) if m.group(1) else 1
     die_size = int(m.group(2))
     flat_bonus = 0
     rest = s[m.end():]
-    for sign, num in re.findall(r'([+-])(\d+)', rest):
+    for sign, num in _SIGN_NUM_RE.findall(rest):
         flat_bonus += int(num) if sign == '+' else -int(num)
     return dice_count, die_size, flat_bonus
 
 
+@functools.lru_cache(maxsize=256)
 def max_pbd_factor_for_die(die_size: int) -> float:
     """
     Piecewise linear mapping:
@@ -588,16 +713,13 @@ def max_pbd_factor_for_die(die_size: int) -> float:
       d20 -> 2.111... (so 18/20 => ~1.9x)
     For other dice, interpolate.
     """
-    anchors = [(4, 0.50), (10, 1.00), (20, 2.1111111111)]
-    if die_size <= anchors[0][0]:
-        return anchors[0][1]
-    if die_size >= anchors[-1][0]:
-        return anchors[-1][1]
-    for (d0, f0), (d1, f1) in zip(anchors, anchors[1:]):
-        if d0 <= die_size <= d1:
-            t = (die_size - d0) / (d1 - d0)
-            return f0 + t * (f1 - f0)
-    return 1.0
+    if die_size <= 4:
+        return 0.50
+    if die_size >= 20:
+        return 2.1111111111
+    if die_size <= 10:
+        return 0.50 + ((die_size - 4) / 6) * 0.5
+    return 1.00 + ((die_size - 10) / 10) * (2.1111111111 - 1.00)
 
 
 def hit_roll_multiplier(d20_roll: int) -> float:
@@ -613,7 +735,7 @@ def hit_roll_multiplier(d20_roll: int) -> float:
     anchors = [(1, 0.05), (2, 0.20), (10, 1.00), (19, 2.00), (20, 5.00)]
     try:
         r = int(d20_roll)
-    except Exception:
+    except (ValueError, TypeError, OverflowError):
         r = 1
     r = max(1, min(20, r))
 
@@ -662,47 +784,42 @@ def mana_density_multiplier(points: int) -> float:
       10,000 -> 3.00x
       1,000,000 -> 4.00x
     """
-    try:
-        p = int(points)
-    except Exception:
-        p = 0
-    p = max(0, p)
+    return _mana_density_multiplier(max(0, _as_int(points)))
 
+
+@functools.lru_cache(maxsize=256)
+def _mana_density_multiplier(p: int) -> float:
     if p <= 100:
         return 1.0 + (p / 100.0)
 
     return 2.0 + (math.log(p / 100.0) / math.log(100.0))
 
 
-def compute_overcast_bonus(base_cost_eff: int, spent_eff: int, over: dict) -> int:
+def _overcast_params(over) -> Optional[tuple]:
+    """Coerced (scale, power, cap) from an overcast dict, or None if it never adds damage."""
+    if not isinstance(over, dict) or not over.get("enabled", False):
+        return None
+    scale = _as_int(over.get("scale", 0), 0)
+    if scale <= 0:
+        return None
+    return scale, _as_float(over.get("power", 0.85), 0.85), _as_int(over.get("cap", 999), 999)
+
+
+def compute_overcast_bonus(base_cost_eff: int, spent_eff: int, over) -> int:
     """
     Log-ish overcast bonus:
       bonus = floor(scale * (log2(spent/base))^power), capped.
+    `over` is an overcast dict or a tuple already returned by _overcast_params.
     """
     if base_cost_eff <= 0 or spent_eff <= base_cost_eff:
         return 0
-    if not isinstance(over, dict) or not over.get("enabled", False):
-        return 0
-
-    try:
-        scale = int(over.get("scale", 0) or 0)
-    except Exception:
-        scale = 0
-    try:
-        power = float(over.get("power", 0.85) or 0.85)
-    except Exception:
-        power = 0.85
-    try:
-        cap = int(over.get("cap", 999) or 999)
-    except Exception:
-        cap = 999
-
-    if scale <= 0:
+    params = over if type(over) is tuple else _overcast_params(over)
+    if params is None:
         return 0
+    scale, power, cap = params
 
-    ratio = spent_eff / base_cost_eff
-    x = math.log(ratio, 2)  # 1 at 2x, 2 at 4x, etc.
-    bonus = int(math.floor(scale * (x ** power)))
+    x = math.log2(spent_eff / base_cost_eff)  # 1 at 2x, 2 at 4x, etc.
+    bonus = int(math.floor(scale * (x if power == 1.0 else x ** power)))
     if cap >= 0:
         bonus = min(bonus, cap)
     return max(0, bonus)
@@ -713,11 +830,9 @@ def phys_dr_from_points(phys_def_points: int) -> int:
     Physical Defense gives flat DR:
       every 5 points => 1 damage reduction.
     """
-    try:
-        p = int(phys_def_points)
-    except Exception:
-        p = 0
-    return max(0, p // 5)
+    if type(phys_def_points) is int:
+        return phys_def_points // 5 if phys_def_points > 0 else 0
+    return max(0, _as_int(phys_def_points) // 5)
 
 
 # ---------------- Tier helpers (see Context/tier_rules.md) ----------------
@@ -949,6 +1064,9 @@ STATUS_EFFECT_LIBRARY = [
 
 # ---------------- Data schema helpers ----------------
 
+_DEFAULT_STATS = {k: (0 if k == "mana_density" else 5) for k in STAT_KEYS}
+
+
 def default_character_template(name="New Hero"):
     return {
         "name": name,
@@ -958,7 +1076,7 @@ def default_character_template(name="New Hero"):
             "mana": {"current": 10, "max": 10},
             "unspent_points": 0
         },
-        "stats": {k: (0 if k == "mana_density" else 5) for k in STAT_KEYS},
+        "stats": dict(_DEFAULT_STATS),
         "skills": {
             "core": {"current": 0, "max": 7},
             "inner": {"current": 0, "max": 9},
@@ -994,13 +1112,10 @@ def _migrate_stats_schema(char: dict):
         char["stats"] = {k: 0 for k in STAT_KEYS}
         stats = char["stats"]
 
-    has_any_new = any(k in stats for k in STAT_KEYS)
+    has_any_new = not STAT_KEYS_SET.isdisjoint(stats)
 
     def _get_int(d, key, default=0):
-        try:
-            return int(d.get(key, default) or default)
-        except Exception:
-            return default
+        return _as_int(d.get(key, default), default)
 
     if not has_any_new:
         mapped = {k: 0 for k in STAT_KEYS}
@@ -1015,14 +1130,10 @@ def _migrate_stats_schema(char: dict):
 
         char["stats"] = mapped
         stats = char["stats"]
-    else:
+    elif not all(type(stats.get(k)) is int for k in STAT_KEYS):
+        # Only re-coerce sheets that actually have missing / non-int stats.
         for k in STAT_KEYS:
-            if k not in stats:
-                stats[k] = 0
-            try:
-                stats[k] = int(stats[k] or 0)
-            except Exception:
-                stats[k] = 0
+            stats[k] = _as_int(stats.get(k))
 
     # Migrate PBD from resources to stats (old saves stored pbd under resources)
     res = char.get("resources", {})
@@ -1080,10 +1191,16 @@ def _migrate_tier_schema(char: dict):
 
 
 def sort_favorites_first(items):
-    return sorted(items, key=lambda it: (not bool(it.get("favorite", False)), it.get("name", "").lower()))
+    # Sort by name once, then stable-partition favorites to the front; avoids
+    # building and comparing a (favorite, name) tuple key per item.
+    favorites, rest = [], []
+    for it in sorted(items, key=lambda it: it.get("name", "").lower()):
+        (favorites if it.get("favorite", False) else rest).append(it)
+    favorites.extend(rest)
+    return favorites
 
 
-BOOST_TARGETS = STAT_KEYS + ["hp_max", "mana_max"]
+BOOST_TARGETS = STAT_KEYS + ("hp_max", "mana_max")
 BOOST_TARGET_LABELS = [(k, lbl) for k, lbl in STAT_ORDER] + [("hp_max", "HP Max"), ("mana_max", "Mana Max")]
 
 
@@ -1228,18 +1345,9 @@ def ensure_ability_obj(x):
         if not isinstance(over, dict):
             over = {}
 
-        try:
-            scale = int(over.get("scale", 0) or 0)
-        except Exception:
-            scale = 0
-        try:
-            power = float(over.get("power", 0.85) or 0.85)
-        except Exception:
-            power = 0.85
-        try:
-            cap = int(over.get("cap", 999) or 999)
-        except Exception:
-            cap = 999
+        scale = _as_int(over.get("scale", 0), 0)
+        power = _as_float(over.get("power", 0.85), 0.85)
+        cap = _as_int(over.get("cap", 999), 999)
         enabled = bool(over.get("enabled", False))
 
         return {
@@ -1284,21 +1392,18 @@ def parse_research_prompt(prompt: str) -> dict:
         - keywords: raw words from prompt
     """
     prompt_lower = prompt.lower()
-    words = re.findall(r'\w+', prompt_lower)
+    words = _WORD_RE.findall(prompt_lower)
 
-    elements = []
-    archetypes = []
+    # Intersect the distinct words with each keyword table in C; the words are
+    # only walked (in prompt order, to keep first-seen order) when there is a hit.
+    unique_words = dict.fromkeys(words)
+    elem_hits = KEYWORD_TO_ELEMENT.keys() & unique_words
+    arch_hits = KEYWORD_TO_ARCHETYPE.keys() & unique_words
 
-    for word in words:
-        if word in KEYWORD_TO_ELEMENT:
-            elem = KEYWORD_TO_ELEMENT[word]
-            if elem not in elements:
-                elements.append(elem)
-
-        if word in KEYWORD_TO_ARCHETYPE:
-            arch = KEYWORD_TO_ARCHETYPE[word]
-            if arch not in archetypes:
-                archetypes.append(arch)
+    elements = list(dict.fromkeys(
+        KEYWORD_TO_ELEMENT[w] for w in unique_words if w in elem_hits)) if elem_hits else []
+    archetypes = list(dict.fromkeys(
+        KEYWORD_TO_ARCHETYPE[w] for w in unique_words if w in arch_hits)) if arch_hits else []
 
     # Defaults if nothing detected
     if not elements:
@@ -1364,17 +1469,16 @@ def calculate_spell_stats(archetype: str, tier: str, category: str, mana_density
     cat_mods = ABILITY_MODS.get(category, ABILITY_MODS["inner"])
 
     # Calculate dice
-    dice_count = random.randint(*tier_info["count_range"])
-    dice_size = random.choice([d for d in [4, 6, 8, 10, 12, 20]
-                                if tier_info["min"] <= d <= tier_info["max"]])
+    dice_count = random.randint(*tier_info.count_range)
+    dice_size = random.choice(TIER_ALLOWED_DICE.get(tier, DEFAULT_ALLOWED_DICE))
 
     # Flat bonus based on tier
     flat_bonus = random.randint(0, dice_count)
 
     # Apply archetype power scaling
-    if archetype_data["power_weight"] < 1.0:
+    if archetype_data.power_weight < 1.0:
         # Reduce dice for defensive/utility
-        if random.random() > archetype_data["power_weight"]:
+        if random.random() > archetype_data.power_weight:
             dice_count = max(1, dice_count - 1)
 
     # Build damage expression
@@ -1385,14 +1489,14 @@ def calculate_spell_stats(archetype: str, tier: str, category: str, mana_density
     # Calculate mana cost
     # Base: avg damage * category mana mod * archetype mana weight
     avg_dmg = dice_count * (dice_size / 2 + 0.5) + flat_bonus
-    base_mana = int(avg_dmg * cat_mods["mana"] * archetype_data["mana_weight"])
+    base_mana = int(avg_dmg * cat_mods.mana * archetype_data.mana_weight)
 
     # Add randomness (±20%)
     mana_variance = int(base_mana * 0.2)
     mana_cost = max(1, base_mana + random.randint(-mana_variance, mana_variance))
 
     # Roll type
-    roll_type = random.choice(archetype_data["roll_types"])
+    roll_type = random.choice(archetype_data.roll_types)
 
     # Overcast (30% chance for offensive spells)
     overcast = {"enabled": False, "scale": 0, "power": 0.85, "cap": 999}
@@ -1459,13 +1563,12 @@ def generate_spell_description(name: str, element: str, archetype: str, stats: d
 def _generate_fallback_items(tags: list, tier: str) -> list:
     """Generate basic weapons when the item library has nothing suitable."""
     tier_info = TIER_DICE.get(tier, DEFAULT_TIER_DICE)
-    valid_dice = [d for d in [4, 6, 8, 10, 12, 20]
-                  if tier_info["min"] <= d <= tier_info["max"]]
+    valid_dice = TIER_ALLOWED_DICE.get(tier, DEFAULT_ALLOWED_DICE)
     items = []
 
     if "Melee" in tags or (not tags):
         ds = random.choice(valid_dice)
-        dc = random.randint(*tier_info["count_range"])
+        dc = random.randint(*tier_info.count_range)
         bonus = random.randint(0, dc)
         dmg = f"{dc}d{ds}" + (f"+{bonus}" if bonus else "")
         items.append(ensure_item_obj({
@@ -1476,7 +1579,7 @@ def _generate_fallback_items(tags: list, tier: str) -> list:
 
     if "Ranged" in tags:
         ds = random.choice(valid_dice)
-        dc = random.randint(*tier_info["count_range"])
+        dc = random.randint(*tier_info.count_range)
         bonus = random.randint(0, dc)
         dmg = f"{dc}d{ds}" + (f"+{bonus}" if bonus else "")
         items.append(ensure_item_obj({
@@ -1673,7 +1776,8 @@ def generate_mob_character(name: str, tier: str, position: str,
 
 
 def generate_spell_options(prompt_data: dict, category: str, tier: str,
-                          mana_density: int, char_stats: dict, original_prompt: str = "") -> list:
+                          mana_density: int, char_stats: dict, original_prompt: str = "",
+                          on_spell=None) -> list:
     """
     Generate 5 varied spell options using Ollama AI (with template fallback).
 
@@ -1684,6 +1788,8 @@ def generate_spell_options(prompt_data: dict, category: str, tier: str,
         mana_density: character's mana density value
         char_stats: character's stats dict (for future enhancements)
         original_prompt: the original user prompt for Ollama
+        on_spell: optional callback(index, spell); Ollama output is streamed
+            and each spell is reported as soon as it is complete
 
     Returns:
         List of 5 spell dicts ready to pass to ensure_ability_obj()
@@ -1692,7 +1798,8 @@ def generate_spell_options(prompt_data: dict, category: str, tier: str,
     if OLLAMA_AVAILABLE and original_prompt:
         try:
             return generate_spell_options_with_ollama(
-                original_prompt, prompt_data, category, tier, mana_density, char_stats
+                original_prompt, prompt_data, category, tier, mana_density, char_stats,
+                client=_get_ollama(), on_spell=on_spell,
             )
         except Exception as e:
             print(f"Ollama generation failed, using template fallback: {e}")
@@ -1705,19 +1812,19 @@ def generate_spell_options(prompt_data: dict, category: str, tier: str,
 
     # Strategy: ensure variety
     # Expand archetype pool to ensure variety
-    all_archetypes = list(SPELL_ARCHETYPES.keys())
-    archetype_pool = archetypes.copy()
+    archetype_pool = list(dict.fromkeys(archetypes))
+
+    # Top up with distinct random archetypes in a single draw
+    need = 5 - len(archetype_pool)
+    if need > 0:
+        remaining = [a for a in SPELL_ARCHETYPES if a not in archetype_pool]
+        archetype_pool += random.sample(remaining, k=min(need, len(remaining)))
 
-    # Add some random archetypes for variety
-    while len(archetype_pool) < 5:
-        extra = random.choice(all_archetypes)
-        if extra not in archetype_pool:
-            archetype_pool.append(extra)
+    # Draw every spell's element up front
+    spell_elements = random.choices(elements, k=5)
 
     # Generate 5 spells
-    for i in range(5):
-        # Pick element and archetype
-        element = random.choice(elements)
+    for i, element in enumerate(spell_elements):
         archetype = archetype_pool[i % len(archetype_pool)]
 
         # Generate name
@@ -1745,104 +1852,209 @@ def generate_spell_options(prompt_data: dict, category: str, tier: str,
     return spells
 
 
+# Structured-output schemas: Ollama constrains the reply to exactly
+# {key: [5 objects with these fields]}, so no reply-shape guessing is needed.
+_OLLAMA_SPELL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "roll_type": {"type": "string", "enum": ROLL_TYPES},
+        "damage": {"type": "string"},
+        "mana_cost": {"type": "integer"},
+        "notes": {"type": "string"},
+        "overcast_enabled": {"type": "boolean"},
+    },
+    "required": ["name", "roll_type", "damage", "mana_cost", "notes", "overcast_enabled"],
+}
+_OLLAMA_FORMATS = {
+    key: {
+        "type": "object",
+        "properties": {key: {"type": "array", "items": _OLLAMA_SPELL_SCHEMA, "minItems": 5, "maxItems": 5}},
+        "required": [key],
+    }
+    for key in ("spells", "upgrades")
+}
+
+
+def _ollama_json_list(data, key: str) -> list:
+    """The `key` array of a schema-constrained Ollama reply."""
+    items = data[key]
+    if not isinstance(items, list):
+        raise TypeError(f"'{key}' is not a list")
+    return items
+
+
+def _ollama_generate_list(client, prompt: str, key: str, model: str = GEN_MODEL) -> list:
+    """One structured-output Ollama request; returns the reply's `key` list of objects."""
+    response = client.generate(
+        model=model,
+        prompt=prompt,
+        format=_OLLAMA_FORMATS[key],
+        options={'temperature': 0.8},
+        keep_alive=OLLAMA_KEEP_ALIVE,
+    )
+
+    response_text = response.get('response', '').strip()
+    if not response_text:
+        raise Exception("Empty response")
+
+    return _ollama_json_list(_json_loads(response_text), key)
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _iter_streamed_json_array(chunks, key: str):
+    """
+    Incrementally parse a streamed JSON reply shaped like {key: [obj, ...]} and
+    yield each array element as soon as it is complete.
+    """
+    buf = ""
+    pos = None  # index just inside the array once it has been found
+    key_re = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    for chunk in chunks:
+        buf += chunk
+        if pos is None:
+            m = key_re.search(buf)
+            if not m:
+                continue
+            pos = m.end()
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                return
+            try:
+                obj, pos = _JSON_DECODER.raw_decode(buf, pos)
+            except ValueError:
+                break  # element not complete yet
+            yield obj
+
+
+def _spell_from_ollama(i: int, spell_data: dict) -> dict:
+    """Validate one generated spell object into a spell dict."""
+    name = spell_data.get('name', f"Unnamed Spell {i+1}")
+    damage = spell_data.get('damage', "1d6") or "1d6"
+    mana_cost = spell_data.get('mana_cost', 5)
+    try:
+        mana_cost = int(mana_cost)
+    except (ValueError, TypeError):
+        mana_cost = 5
+    roll_type = spell_data.get('roll_type', "Attack")
+    notes = spell_data.get('notes', "A magical spell.")
+
+    overcast_enabled = spell_data.get("overcast_enabled", False)
+    overcast = {
+        "enabled": overcast_enabled,
+        "scale": 3 if overcast_enabled else 0,
+        "power": 0.85,
+        "cap": 999
+    }
+
+    return {
+        "name": str(name),
+        "favorite": False,
+        "roll_type": str(roll_type),
+        "damage": str(damage),
+        "mana_cost": mana_cost,
+        "notes": str(notes),
+        "overcast": overcast,
+    }
+
+
 def generate_spell_options_with_ollama(prompt: str, prompt_data: dict, category: str,
-                                       tier: str, mana_density: int, char_stats: dict) -> list:
+                                       tier: str, mana_density: int, char_stats: dict,
+                                       client=None, on_spell=None) -> list:
     """
-    Generate 5 spell options using Ollama LLM (gemma3:4b).
-    Calls Ollama once per spell for reliable single-object JSON output.
+    Generate 5 spell options using Ollama LLM (GEN_MODEL).
+    Asks for all 5 in one request (one shared prompt, one decode); any spell the
+    model omits or gets wrong is replaced with a template spell.
+    If on_spell is given the reply is streamed and on_spell(index, spell) is
+    called (from the calling thread) as each spell completes.
 
     Returns list of spell dicts or raises exception if Ollama fails.
     """
+    client = client or _get_ollama()
     elements = ', '.join(prompt_data.get('elements', ['arcane']))
 
     # 5 different creative directions for variety
     spell_styles = [
-        f"Create an offensive attack spell. {prompt}",
-        f"Create a defensive or utility spell. {prompt}",
-        f"Create a powerful area-of-effect spell. {prompt}",
-        f"Create a unique or unusual spell. {prompt}",
-        f"Create a versatile combat spell. {prompt}",
+        "an offensive attack spell",
+        "a defensive or utility spell",
+        "a powerful area-of-effect spell",
+        "a unique or unusual spell",
+        "a versatile combat spell",
     ]
+    style_lines = "\n".join(f"{n}. {style}" for n, style in enumerate(spell_styles, 1))
 
-    spells = []
-    for i, style in enumerate(spell_styles):
-        try:
-            spell_prompt = f"""Create one magic spell as a JSON object.
+    spell_prompt = f"""Create {len(spell_styles)} different magic spells as a JSON object.
 
-Request: {style}
+Request: {prompt}
 Elements: {elements}
 Tier: {tier}
 
-Return ONE JSON object like this example:
-{{"name": "Arcane Blast", "roll_type": "Attack", "damage": "2d6", "mana_cost": 8, "notes": "Fire magical energy at target", "overcast_enabled": false}}
+Make one spell of each style, in this order:
+{style_lines}
+
+Return ONE JSON object with a "spells" array like this example:
+{{"spells": [{{"name": "Arcane Blast", "roll_type": "Attack", "damage": "2d6", "mana_cost": 8, "notes": "Fire magical energy at target", "overcast_enabled": false}}]}}
 
 roll_type must be "Attack", "Save", or "None".
 damage should use dice notation like "2d6" or "3d8+1". Use "" for no damage.
 mana_cost should be a number between 1 and 30."""
 
-            response = ollama.generate(
-                model='gemma3:4b',
-                prompt=spell_prompt,
-                format='json',
-                options={'temperature': 0.8}
-            )
-
-            response_text = response.get('response', '').strip()
-            if not response_text:
-                raise Exception("Empty response")
-
-            spell_data = json.loads(response_text)
-
-            # If we got a wrapped dict, extract it
-            if isinstance(spell_data, dict) and 'name' not in spell_data:
-                for key in spell_data:
-                    val = spell_data[key]
-                    if isinstance(val, dict) and 'name' in val:
-                        spell_data = val
-                        break
-                    elif isinstance(val, list) and len(val) > 0:
-                        spell_data = val[0]
-                        break
-
-            # Validate and build spell
-            name = spell_data.get('name', f"Unnamed Spell {i+1}")
-            damage = spell_data.get('damage', "1d6") or "1d6"
-            mana_cost = spell_data.get('mana_cost', 5)
-            try:
-                mana_cost = int(mana_cost)
-            except (ValueError, TypeError):
-                mana_cost = 5
-            roll_type = spell_data.get('roll_type', "Attack")
-            notes = spell_data.get('notes', "A magical spell.")
-
-            overcast_enabled = spell_data.get("overcast_enabled", False)
-            overcast = {
-                "enabled": overcast_enabled,
-                "scale": 3 if overcast_enabled else 0,
-                "power": 0.85,
-                "cap": 999
-            }
+    def _fallback(i):
+        return {
+            "name": f"Arcane Spell {i+1}",
+            "favorite": False,
+            "roll_type": "Attack",
+            "damage": "1d6",
+            "mana_cost": 5,
+            "notes": "A basic magical spell.",
+            "overcast": {"enabled": False, "scale": 0, "power": 0.85, "cap": 999},
+        }
 
-            spells.append({
-                "name": str(name),
-                "favorite": False,
-                "roll_type": str(roll_type),
-                "damage": str(damage),
-                "mana_cost": mana_cost,
-                "notes": str(notes),
-                "overcast": overcast,
-            })
+    def _build(i, data):
+        try:
+            return _spell_from_ollama(i, data)
         except Exception as e:
             print(f"Warning: Spell {i+1} generation failed: {e}. Using template fallback for this spell.")
-            spells.append({
-                "name": f"Arcane Spell {i+1}",
-                "favorite": False,
-                "roll_type": "Attack",
-                "damage": "1d6",
-                "mana_cost": 5,
-                "notes": "A basic magical spell.",
-                "overcast": {"enabled": False, "scale": 0, "power": 0.85, "cap": 999},
-            })
+            return _fallback(i)
+
+    spells = []
+    if on_spell is None:
+        try:
+            items = _ollama_generate_list(client, spell_prompt, "spells")
+        except Exception as e:
+            print(f"Warning: Spell generation failed: {e}. Using template fallback.")
+            items = []
+        spells = [_build(i, items[i]) if i < len(items) else _fallback(i)
+                  for i in range(len(spell_styles))]
+        return spells[:5]
+
+    # Streaming: hand each spell to on_spell as soon as its JSON object closes.
+    try:
+        stream = client.generate(
+            model=GEN_MODEL,
+            prompt=spell_prompt,
+            format=_OLLAMA_FORMATS["spells"],
+            options={'temperature': 0.8},
+            keep_alive=OLLAMA_KEEP_ALIVE,
+            stream=True,
+        )
+        for data in _iter_streamed_json_array((part.get('response', '') for part in stream), "spells"):
+            spells.append(_build(len(spells), data))
+            on_spell(len(spells) - 1, spells[-1])
+            if len(spells) == len(spell_styles):
+                break
+    except Exception as e:
+        print(f"Warning: Spell generation failed: {e}. Using template fallback.")
+
+    while len(spells) < len(spell_styles):
+        spells.append(_fallback(len(spells)))
+        on_spell(len(spells) - 1, spells[-1])
 
     return spells[:5]
 
@@ -1851,23 +2063,73 @@ mana_cost should be a number between 1 and 30."""
 
 LIBRARY_PATH = Path("spell_library.json")
 
+# Parsed library, reused while the file's mtime is unchanged, plus lookup
+# indices over it: id -> position, and metadata field -> value -> positions.
+_LIB_CACHE = {"mtime": None, "data": None, "by_id": None, "by_meta": None}
+
+# The usual library filter; by_meta also indexes it as one composite key
+# (value tuple -> ordered positions) so it needs no set intersection.
+_LIBRARY_FILTER_PAIR = ("category", "tier")
+
+
+def _build_library_index(spells: list):
+    by_id = {}
+    by_meta = {}
+    by_pair = by_meta[_LIBRARY_FILTER_PAIR] = {}
+    for pos, entry in enumerate(spells):
+        by_id.setdefault(entry.get("id"), pos)
+        metadata = entry.get("metadata", {})
+        for key, value in metadata.items():
+            try:
+                by_meta.setdefault(key, {}).setdefault(value, set()).add(pos)
+            except TypeError:  # unhashable value; filters on it fall back to a scan
+                pass
+        try:
+            by_pair.setdefault(tuple(metadata.get(k) for k in _LIBRARY_FILTER_PAIR), []).append(pos)
+        except TypeError:
+            pass
+    return by_id, by_meta
+
+
+def _set_library_cache(mtime, data):
+    _LIB_CACHE["mtime"] = mtime
+    _LIB_CACHE["data"] = data
+    if data is None:
+        _LIB_CACHE["by_id"] = _LIB_CACHE["by_meta"] = None
+    else:
+        _LIB_CACHE["by_id"], _LIB_CACHE["by_meta"] = _build_library_index(data["spells"])
+
+
+def _library_index(library: dict):
+    """(by_id, by_meta) for `library`, reusing the cached index when it is the cached dict."""
+    if library is _LIB_CACHE["data"]:
+        return _LIB_CACHE["by_id"], _LIB_CACHE["by_meta"]
+    return _build_library_index(library.get("spells", []))
+
 
 def load_spell_library() -> dict:
     """
     Load spell library from spell_library.json.
     Returns {"spells": [...]} structure.
+
+    The parsed dict is cached and shared between calls until the file changes
+    on disk; callers that modify it must save it with save_spell_library().
     """
-    if not LIBRARY_PATH.exists():
+    try:
+        mtime = LIBRARY_PATH.stat().st_mtime_ns
+    except OSError:
         return {"spells": []}
+    if _LIB_CACHE["mtime"] == mtime:
+        return _LIB_CACHE["data"]
 
     try:
-        with open(LIBRARY_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            if isinstance(data, dict) and "spells" in data:
-                return data
-            return {"spells": []}
-    except Exception:
+        data = _json_loads(LIBRARY_PATH.read_bytes())
+        if not (isinstance(data, dict) and "spells" in data):
+            data = {"spells": []}
+    except (OSError, ValueError):
         return {"spells": []}
+    _set_library_cache(mtime, data)
+    return data
 
 
 def save_spell_library(library: dict) -> None:
@@ -1875,60 +2137,92 @@ def save_spell_library(library: dict) -> None:
     Save spell library to spell_library.json.
     """
     try:
-        with open(LIBRARY_PATH, 'w', encoding='utf-8') as f:
-            json.dump(library, f, indent=2, ensure_ascii=False)
-    except Exception:
-        pass
+        _write_bytes_atomic(LIBRARY_PATH, _json_dump_bytes(library))
+        _set_library_cache(LIBRARY_PATH.stat().st_mtime_ns, library)
+    except (OSError, TypeError, ValueError):
+        # Don't keep serving a dict that may hold unsaved changes.
+        _set_library_cache(None, None)
+
+
+def _new_library_id() -> str:
+    """Unique library entry id: hex nanosecond timestamp + random suffix."""
+    return f"{time.time_ns():x}_{secrets.token_hex(3)}"
 
 
-def add_spell_to_library(spell: dict, metadata: dict) -> str:
+def add_spell_to_library(spell: dict, metadata: dict, *, copy: bool = True) -> str:
     """
     Add spell to library with metadata.
     Returns unique spell ID.
     """
-    library = load_spell_library()
+    return add_spells_to_library([(spell, metadata)], copy=copy)[0]
 
-    # Generate unique ID
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    random_suffix = ''.join(random.choices('0123456789abcdef', k=6))
-    spell_id = f"{timestamp}_{random_suffix}"
 
-    entry = {
-        "id": spell_id,
-        "spell": spell.copy(),
-        "metadata": metadata.copy()
-    }
+def add_spells_to_library(entries: list, *, copy: bool = True) -> list:
+    """
+    Add several (spell, metadata) pairs to the library with a single load and save.
+    Returns the new spell IDs in order.
+
+    The library is cached between calls, so entries are deep-copied by default;
+    with copy=False the dicts are stored as-is and callers hand over fresh
+    dicts they won't mutate afterwards.
+    """
+    library = load_spell_library()
+    taken = set(_library_index(library)[0])
+
+    spell_ids = []
+    for spell, metadata in entries:
+        # Generate unique ID (also unique within this batch)
+        spell_id = _new_library_id()
+        while spell_id in taken:
+            spell_id = _new_library_id()
+        taken.add(spell_id)
+
+        library["spells"].append({
+            "id": spell_id,
+            "spell": deepcopy(spell) if copy else spell,
+            "metadata": deepcopy(metadata) if copy else metadata
+        })
+        spell_ids.append(spell_id)
 
-    library["spells"].append(entry)
     save_spell_library(library)
 
-    return spell_id
+    return spell_ids
 
 
 def get_library_spells(filters: dict = None) -> list:
     """
     Get spells from library, optionally filtered.
+    Returns a new list, but the entries are the cached library's own dicts:
+    treat them as read-only and use import_spell_from_library() for a copy.
     """
     library = load_spell_library()
     spells = library.get("spells", [])
 
     if not filters:
-        return spells
-
-    filtered = []
-    for entry in spells:
-        metadata = entry.get("metadata", {})
-        match = True
+        return list(spells)
 
-        for key, value in filters.items():
-            if metadata.get(key) != value:
-                match = False
-                break
+    _, by_meta = _library_index(library)
+    if filters.keys() == set(_LIBRARY_FILTER_PAIR):
+        try:
+            target = tuple(filters[k] for k in _LIBRARY_FILTER_PAIR)
+            return [spells[pos] for pos in by_meta[_LIBRARY_FILTER_PAIR].get(target, ())]
+        except TypeError:  # unhashable filter value: general path below
+            pass
 
-        if match:
-            filtered.append(entry)
+    positions = None
+    for key, value in filters.items():
+        try:
+            if value is None:  # also matches entries missing the field entirely
+                raise TypeError
+            hits = by_meta.get(key, {}).get(value, set())
+        except TypeError:  # None / unhashable filter value: scan instead
+            hits = {pos for pos, entry in enumerate(spells)
+                    if entry.get("metadata", {}).get(key) == value}
+        positions = hits if positions is None else positions & hits
+        if not positions:
+            return []
 
-    return filtered
+    return [spells[pos] for pos in sorted(positions)]
 
 
 def remove_from_library(spell_id: str) -> bool:
@@ -1937,30 +2231,29 @@ def remove_from_library(spell_id: str) -> bool:
     Returns True if removed, False if not found.
     """
     library = load_spell_library()
-    spells = library.get("spells", [])
-
-    for i, entry in enumerate(spells):
-        if entry.get("id") == spell_id:
-            spells.pop(i)
-            library["spells"] = spells
-            save_spell_library(library)
-            return True
+    by_id, _ = _library_index(library)
+    pos = by_id.get(spell_id)
+    if pos is None:
+        return False
 
-    return False
+    library["spells"].pop(pos)
+    save_spell_library(library)
+    return True
 
 
-def import_spell_from_library(spell_id: str) -> dict:
+def import_spell_from_library(spell_id: str, *, copy: bool = True) -> dict:
     """
     Get spell dict from library by ID (without metadata).
-    Returns None if not found.
+    Returns None if not found. With copy=False the cached library dict itself
+    is returned and must be treated as read-only.
     """
     library = load_spell_library()
-
-    for entry in library.get("spells", []):
-        if entry.get("id") == spell_id:
-            return entry.get("spell", {}).copy()
-
-    return None
+    by_id, _ = _library_index(library)
+    pos = by_id.get(spell_id)
+    if pos is None:
+        return None
+    spell = library["spells"][pos].get("spell", {})
+    return deepcopy(spell) if copy else spell
 
 
 # ---------------- Item Library ----------------
@@ -1972,28 +2265,24 @@ def load_item_library() -> dict:
     if not ITEM_LIBRARY_PATH.exists():
         return {"items": []}
     try:
-        with open(ITEM_LIBRARY_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            if isinstance(data, dict) and "items" in data:
-                return data
-            return {"items": []}
-    except Exception:
+        data = _json_loads(ITEM_LIBRARY_PATH.read_bytes())
+        if isinstance(data, dict) and "items" in data:
+            return data
+        return {"items": []}
+    except (OSError, ValueError):
         return {"items": []}
 
 
 def save_item_library(library: dict) -> None:
     try:
-        with open(ITEM_LIBRARY_PATH, 'w', encoding='utf-8') as f:
-            json.dump(library, f, indent=2, ensure_ascii=False)
-    except Exception:
+        _write_bytes_atomic(ITEM_LIBRARY_PATH, _json_dump_bytes(library))
+    except (OSError, TypeError, ValueError):
         pass
 
 
 def add_item_to_library(item: dict, metadata: dict) -> str:
     library = load_item_library()
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    random_suffix = ''.join(random.choices('0123456789abcdef', k=6))
-    item_id = f"{timestamp}_{random_suffix}"
+    item_id = _new_library_id()
     entry = {
         "id": item_id,
         "item": item.copy(),
@@ -2039,6 +2328,12 @@ def import_item_from_library(item_id: str) -> dict:
 
 # ---------------- Spell Upgrade Functions ----------------
 
+_UPGRADE_DICE_RE = re.compile(r'(\d+)d(\d+)([+-]\d+)?')
+
+# Next die size up when an upgrade grows the dice (d20 stays d20).
+_DICE_SIZE_PROGRESSION = {4: 6, 6: 8, 8: 10, 10: 12, 12: 20, 20: 20}
+
+
 def parse_damage_expr(expr: str) -> tuple:
     """
     Parse dice expression like "2d6+3" into (count, size, bonus).
@@ -2048,16 +2343,25 @@ def parse_damage_expr(expr: str) -> tuple:
     if not expr:
         return (0, 0, 0)
 
+    # Fast path for the plain "XdY" / "XdY+Z" / "XdY-Z" forms; anything
+    # else (trailing text, multiple bonuses, ...) goes through the regex.
+    i = expr.find("d")
+    if i > 0 and expr[:i].isdecimal():
+        tail = expr[i + 1:]
+        if tail.isdecimal():
+            return (int(expr[:i]), int(tail), 0)
+        for sign in "+-":
+            j = tail.find(sign)
+            if j > 0 and tail[:j].isdecimal() and tail[j + 1:].isdecimal():
+                return (int(expr[:i]), int(tail[:j]), int(tail[j:]))
+
     # Pattern: XdY or XdY+Z or XdY-Z
-    match = re.match(r'(\d+)d(\d+)([+-]\d+)?', expr)
+    match = _UPGRADE_DICE_RE.match(expr)
     if not match:
         return (0, 0, 0)
 
-    count = int(match.group(1))
-    size = int(match.group(2))
-    bonus = int(match.group(3)) if match.group(3) else 0
-
-    return (count, size, bonus)
+    count, size, bonus = match.groups()
+    return (int(count), int(size), int(bonus) if bonus else 0)
 
 
 def build_damage_expr(count: int, size: int, bonus: int) -> str:
@@ -2072,10 +2376,52 @@ def build_damage_expr(count: int, size: int, bonus: int) -> str:
     return expr
 
 
+def _upgrade_from_ollama(i: int, upgrade_data: dict, base_spell: dict) -> dict:
+    """Validate one generated upgrade object against the spell it upgrades."""
+    name = base_spell.get("name", "Unknown Spell")
+    damage = base_spell.get("damage", "1d6")
+    mana_cost = base_spell.get("mana_cost", 1)
+    roll_type = base_spell.get("roll_type", "None")
+    notes = base_spell.get("notes", "")
+    overcast = base_spell.get("overcast", {})
+
+    upgrade_name = upgrade_data.get('name', f"Upgraded {name} {i+1}")
+    upgrade_damage = upgrade_data.get('damage', damage) or damage
+    upgrade_mana = upgrade_data.get('mana_cost', mana_cost)
+    try:
+        upgrade_mana = int(upgrade_mana)
+    except (ValueError, TypeError):
+        upgrade_mana = mana_cost
+    upgrade_roll_type = upgrade_data.get('roll_type', roll_type)
+    upgrade_notes = upgrade_data.get('notes', notes)
+
+    # Build overcast
+    overcast_enabled = upgrade_data.get("overcast_enabled", False)
+    new_overcast = overcast.copy() if isinstance(overcast, dict) else {}
+    if overcast_enabled and not new_overcast.get("enabled"):
+        new_overcast["enabled"] = True
+        new_overcast["scale"] = 3
+        new_overcast["power"] = 0.85
+        new_overcast["cap"] = 999
+    elif overcast_enabled and new_overcast.get("enabled"):
+        new_overcast["scale"] = new_overcast.get("scale", 3) + 1
+
+    return {
+        "name": str(upgrade_name),
+        "favorite": False,
+        "roll_type": str(upgrade_roll_type),
+        "damage": str(upgrade_damage),
+        "mana_cost": upgrade_mana,
+        "notes": str(upgrade_notes),
+        "overcast": new_overcast,
+    }
+
+
 def generate_spell_upgrades_with_ollama(base_spell: dict, category: str, tier: str, training_prompt: str = "") -> list:
     """
-    Generate 5 spell upgrade options using Ollama LLM (gemma3:4b).
-    Calls Ollama once per upgrade for reliable single-object JSON output.
+    Generate 5 spell upgrade options using Ollama LLM (UPGRADE_MODEL).
+    Asks for all 5 in one request; any upgrade the model omits or gets wrong is
+    replaced with a minor template upgrade.
 
     Returns list of 5 upgraded spell dicts or raises exception if Ollama fails.
     """
@@ -2087,84 +2433,34 @@ def generate_spell_upgrades_with_ollama(base_spell: dict, category: str, tier: s
     notes = base_spell.get("notes", "")
     overcast = base_spell.get("overcast", {})
 
-    training_context = f" The caster trained by: {training_prompt}." if training_prompt else ""
+    training_context = f"\nThe caster trained by: {training_prompt}." if training_prompt else ""
 
     # Define 5 different upgrade focuses
     upgrade_focuses = [
-        f"Increase the damage of the spell significantly. Make it hit harder.{training_context}",
-        f"Reduce the mana cost to make it more efficient.{training_context}",
-        f"Add a unique twist or secondary effect. Be creative with the upgrade.{training_context}",
-        f"Balance both damage and mana cost improvements.{training_context}",
-        f"Create a powerful but expensive version with a new name.{training_context}",
+        "Increase the damage of the spell significantly. Make it hit harder.",
+        "Reduce the mana cost to make it more efficient.",
+        "Add a unique twist or secondary effect. Be creative with the upgrade.",
+        "Balance both damage and mana cost improvements.",
+        "Create a powerful but expensive version with a new name.",
     ]
+    focus_lines = "\n".join(f"{n}. {focus}" for n, focus in enumerate(upgrade_focuses, 1))
 
-    upgrades = []
-    for i, focus in enumerate(upgrade_focuses):
-        try:
-            prompt = f"""Create one upgraded version of this spell as a JSON object.
-
-Original: {name} | Damage: {damage} | Mana: {mana_cost} | Type: {roll_type} | Notes: {notes}
-
-Upgrade focus: {focus}
-
-Return ONE JSON object like this example:
-{{"name": "Improved {name}", "roll_type": "{roll_type}", "damage": "2d8", "mana_cost": {mana_cost}, "notes": "A stronger version", "overcast_enabled": false}}"""
+    prompt = f"""Upgrade this spell {len(upgrade_focuses)} ways.
+Spell: {name} | Damage: {damage} | Mana: {mana_cost} | Type: {roll_type} | Notes: {notes}{training_context}
+Focuses, in order:
+{focus_lines}
+JSON only: {{"upgrades": [{{"name": str, "roll_type": str, "damage": "XdY+Z", "mana_cost": int, "notes": str, "overcast_enabled": bool}}]}}"""
 
-            response = ollama.generate(
-                model='gemma3:4b',
-                prompt=prompt,
-                format='json',
-                options={'temperature': 0.8}
-            )
-
-            response_text = response.get('response', '').strip()
-            if not response_text:
-                raise Exception("Empty response")
-
-            upgrade_data = json.loads(response_text)
-
-            # If we got a wrapped dict, extract it
-            if isinstance(upgrade_data, dict) and 'name' not in upgrade_data:
-                for key in upgrade_data:
-                    val = upgrade_data[key]
-                    if isinstance(val, dict) and 'name' in val:
-                        upgrade_data = val
-                        break
-                    elif isinstance(val, list) and len(val) > 0:
-                        upgrade_data = val[0]
-                        break
-
-            # Validate and build upgrade
-            upgrade_name = upgrade_data.get('name', f"Upgraded {name} {i+1}")
-            upgrade_damage = upgrade_data.get('damage', damage) or damage
-            upgrade_mana = upgrade_data.get('mana_cost', mana_cost)
-            try:
-                upgrade_mana = int(upgrade_mana)
-            except (ValueError, TypeError):
-                upgrade_mana = mana_cost
-            upgrade_roll_type = upgrade_data.get('roll_type', roll_type)
-            upgrade_notes = upgrade_data.get('notes', notes)
-
-            # Build overcast
-            overcast_enabled = upgrade_data.get("overcast_enabled", False)
-            new_overcast = overcast.copy() if isinstance(overcast, dict) else {}
-            if overcast_enabled and not new_overcast.get("enabled"):
-                new_overcast["enabled"] = True
-                new_overcast["scale"] = 3
-                new_overcast["power"] = 0.85
-                new_overcast["cap"] = 999
-            elif overcast_enabled and new_overcast.get("enabled"):
-                new_overcast["scale"] = new_overcast.get("scale", 3) + 1
+    try:
+        items = _ollama_generate_list(_get_ollama(), prompt, "upgrades", model=UPGRADE_MODEL)
+    except Exception as e:
+        print(f"Warning: Upgrade generation failed: {e}. Using template fallback.")
+        items = []
 
-            upgrades.append({
-                "name": str(upgrade_name),
-                "favorite": False,
-                "roll_type": str(upgrade_roll_type),
-                "damage": str(upgrade_damage),
-                "mana_cost": upgrade_mana,
-                "notes": str(upgrade_notes),
-                "overcast": new_overcast,
-            })
+    upgrades = []
+    for i in range(len(upgrade_focuses)):
+        try:
+            upgrades.append(_upgrade_from_ollama(i, items[i], base_spell))
         except Exception as e:
             print(f"Warning: Upgrade {i+1} generation failed: {e}. Using template fallback for this upgrade.")
             upgrades.append({
@@ -2217,8 +2513,7 @@ def generate_spell_upgrades(base_spell: dict, category: str, tier: str, training
         else:
             new_count = count
             # Upgrade dice size: d4->d6, d6->d8, d8->d10, d10->d12, d12->d20
-            size_progression = {4: 6, 6: 8, 8: 10, 10: 12, 12: 20, 20: 20}
-            new_size = size_progression.get(size, size)
+            new_size = _DICE_SIZE_PROGRESSION.get(size, size)
         up1["damage"] = build_damage_expr(new_count, new_size, bonus)
     up1["notes"] = notes + " [Upgraded: Increased damage]"
     up1["overcast"] = overcast.copy()
@@ -2279,8 +2574,7 @@ def generate_spell_upgrades(base_spell: dict, category: str, tier: str, training
         else:
             new_count = count
             new_bonus = bonus + 3
-        size_progression = {4: 6, 6: 8, 8: 10, 10: 12, 12: 20, 20: 20}
-        new_size = size_progression.get(size, size)
+        new_size = _DICE_SIZE_PROGRESSION.get(size, size)
         up5["damage"] = build_damage_expr(new_count, new_size, new_bonus)
     else:
         up5["damage"] = damage
@@ -2294,6 +2588,65 @@ def generate_spell_upgrades(base_spell: dict, category: str, tier: str, training
 
 # ---------------- App ----------------
 
+_pending_idle = {}
+
+
+def schedule_idle(widget, fn, key):
+    """Run fn() once on the next idle pass; repeat requests for the same key
+    before then are coalesced into that single call."""
+    key = (str(widget), key)
+    if key in _pending_idle:
+        return
+
+    def _run():
+        _pending_idle.pop(key, None)
+        if widget.winfo_exists():
+            fn()
+
+    _pending_idle[key] = widget.after_idle(_run)
+
+
+def sync_listbox(lb, lines: list):
+    """Make Listbox `lb` show `lines`, touching only the rows that changed.
+
+    The rows last written are remembered on the widget; the common prefix and
+    suffix are kept and only the middle is deleted/reinserted (in one call each).
+    """
+    old = getattr(lb, "_rendered_lines", None)
+    if old is None:
+        old = list(lb.get(0, tk.END))
+    if old == lines:
+        return
+    start = 0
+    limit = min(len(old), len(lines))
+    while start < limit and old[start] == lines[start]:
+        start += 1
+    end_old, end_new = len(old), len(lines)
+    while end_old > start and end_new > start and old[end_old - 1] == lines[end_new - 1]:
+        end_old -= 1
+        end_new -= 1
+    if end_old > start:
+        lb.delete(start, end_old - 1)
+    if end_new > start:
+        lb.insert(start, *lines[start:end_new])
+    lb._rendered_lines = list(lines)
+
+
+# Plain top-level sheet fields: (StringVar attribute, path into the character
+# dict, is_int). refresh_from_model/apply_to_model walk this one table.
+_SCALAR_FIELDS = (
+    ("var_name", ("name",), False),
+    ("var_tier", ("tier",), False),
+    ("var_hp_current", ("resources", "hp", "current"), True),
+    ("var_hp_max", ("resources", "hp", "max"), True),
+    ("var_mana_current", ("resources", "mana", "current"), True),
+    ("var_mana_max", ("resources", "mana", "max"), True),
+    ("var_unspent", ("resources", "unspent_points"), True),
+    ("var_growth_current", ("growth_items", "bound_current"), True),
+    ("var_growth_max", ("growth_items", "bound_max"), True),
+)
+
+
 class CharacterSheet(ttk.Frame):
     def __init__(self, parent, char_path: Path, is_dm: bool = False):
         super().__init__(parent)
@@ -2303,6 +2656,9 @@ class CharacterSheet(ttk.Frame):
 
         self.char = load_character(self.char_path)
         _migrate_stats_schema(self.char)
+        warm_up_ollama()
+        # Slow work (Ollama generation) runs here, never on the Tk thread.
+        self._executor = ThreadPoolExecutor(max_workers=2)
 
         # ----- Vars -----
         self.var_name = tk.StringVar()
@@ -2365,6 +2721,7 @@ class CharacterSheet(ttk.Frame):
             k: tk.StringVar(value=("bag" if k != "bag" else "equipment"))
             for k in self.inv_keys
         }
+        self._inv_move_targets = {k: tuple(x for x in self.inv_keys if x != k) for k in self.inv_keys}
 
         # Stat boost editor vars (per inventory category)
         self.inv_boost_stat = {k: tk.StringVar(value=STAT_KEYS[0]) for k in self.inv_keys}
@@ -2448,7 +2805,19 @@ class CharacterSheet(ttk.Frame):
         # Normalize current UI -> model once, then snapshot as "last saved"
         # (prevents "prompt to save" immediately after opening due to sorting/canonicalization)
         self.apply_to_model()
-        self._last_saved_state = self._serialize_char(self.char)
+        self._last_saved_hash = self._serialize_char(self.char)
+        # Cleared on save; set by traces on the model vars, by the notes boxes and
+        # by every mutator. While it is clear is_dirty() skips the full
+        # apply_to_model + serialize comparison.
+        self._dirty = False
+        model_vars = [getattr(self, attr) for attr, _path, _is_int in _SCALAR_FIELDS]
+        model_vars += self.var_stats.values()
+        model_vars += self.var_mana_stones.values()
+        for var in model_vars:
+            var.trace_add("write", self.mark_dirty)
+        for text in (self.notes_text, self.world_text):
+            text.edit_modified(False)
+            text.bind("<<Modified>>", self._on_text_modified, add="+")
 
         # Update tab label when name changes
         self.var_name.trace_add("write", self._on_name_changed)
@@ -2476,10 +2845,14 @@ class CharacterSheet(ttk.Frame):
         # Advance Tier button: created hidden, shown by _refresh_advance_button at the cap.
         self.btn_advance_tier = ttk.Button(top, text="Advance Tier ⬆", command=self.advance_tier)
         # Live-refresh the bar when the tier field is edited.
-        self.var_tier.trace_add("write", lambda *a: self._refresh_tier_progress())
+        self.var_tier.trace_add(
+            "write", lambda *a: schedule_idle(self, self._refresh_tier_progress, "tier_progress"))
         # Keep the effective-max slash display in sync when the base entries are edited.
-        self.var_hp_max.trace_add("write", lambda *a: self._refresh_equipment_boosts_display())
-        self.var_mana_max.trace_add("write", lambda *a: self._refresh_equipment_boosts_display())
+        # Coalesced so a bulk load that sets both maxes only recomputes boosts once.
+        self.var_hp_max.trace_add(
+            "write", lambda *a: schedule_idle(self, self._refresh_equipment_boosts_display, "equip_boosts"))
+        self.var_mana_max.trace_add(
+            "write", lambda *a: schedule_idle(self, self._refresh_equipment_boosts_display, "equip_boosts"))
 
         ttk.Button(top, text="Save", command=self.on_save).pack(side=tk.RIGHT)
 
@@ -2759,7 +3132,9 @@ class CharacterSheet(ttk.Frame):
     def _clipboard_set(self, text: str):
         self.clipboard_clear()
         self.clipboard_append(text)
-        self.update()  # helps ensure clipboard updates on some systems
+        # Windows/macOS take ownership immediately; X11 only needs pending idle
+        # work flushed, not a full update() that drains every queued event.
+        self.update_idletasks()
 
     def _clipboard_get(self) -> str:
         try:
@@ -2767,9 +3142,24 @@ class CharacterSheet(ttk.Frame):
         except Exception:
             return ""
 
+    def _prefill_from_clipboard(self, win, txt: tk.Text):
+        """Paste the clipboard into an empty `txt` once `win` is showing.
+
+        Reading the clipboard can block (notably on X11), so it is kept off the
+        dialog-open path.
+        """
+        def fill():
+            if not win.winfo_exists() or txt.get("1.0", "end-1c"):
+                return
+            clip = self._clipboard_get()
+            if clip.strip():
+                txt.insert("1.0", clip)
+
+        win.after(50, fill)
+
     def _safe_json_loads(self, s: str):
         try:
-            return json.loads(s)
+            return _json_loads(s)
         except Exception as e:
             raise ValueError(f"Invalid JSON: {e}")
 
@@ -2781,7 +3171,7 @@ class CharacterSheet(ttk.Frame):
             "roll_type": it.get("roll_type", "None"),
             "damage": it.get("damage", ""),
             "notes": it.get("notes", ""),
-            "apply_bonus": bool(it.get("apply_bonus", it.get("apply_pbd", True))),
+            "apply_bonus": bool(it["apply_bonus"] if "apply_bonus" in it else it.get("apply_pbd", True)),
             "is_ranged": bool(it.get("is_ranged", False)),
             "is_two_handed": bool(it.get("is_two_handed", False)),
             "special_name": it.get("special_name", "") or "",
@@ -2837,20 +3227,22 @@ class CharacterSheet(ttk.Frame):
             d["buff_turns"] = bt
         return d
 
-    def _serialize_char(self, char_obj) -> str:
-        """Stable-ish snapshot for dirty checking."""
+    def _serialize_char(self, char_obj) -> bytes:
+        """Snapshot digest for dirty checking (16 bytes, not the whole JSON)."""
         try:
-            return json.dumps(char_obj, sort_keys=True, ensure_ascii=False)
+            data = _json_dump_compact(char_obj)
         except Exception:
             # Fallback: at least something comparable
-            return str(char_obj)
+            data = str(char_obj).encode("utf-8", "surrogatepass")
+        return _digest16(data)
 
     def _save_to_disk(self, show_popup: bool = True) -> bool:
         """Save current UI state to disk. Returns True if successful."""
         try:
             self.apply_to_model()
             save_character(self.char, self.char_path)
-            self._last_saved_state = self._serialize_char(self.char)
+            self._last_saved_hash = self._serialize_char(self.char)
+            self._dirty = False
             if show_popup:
                 messagebox.showinfo("Saved", f"Saved to {self.char_path.name}")
             return True
@@ -2862,10 +3254,23 @@ class CharacterSheet(ttk.Frame):
         name = self.var_name.get().strip()
         return name if name else self.char_path.stem
 
+    def mark_dirty(self, *_args):
+        self._dirty = True
+
+    def _on_text_modified(self, event):
+        # Re-arm the widget's modified flag so the next edit fires again.
+        if event.widget.edit_modified():
+            event.widget.edit_modified(False)
+            self.mark_dirty()
+
     def is_dirty(self) -> bool:
+        if not self._dirty:
+            return False
         self.apply_to_model()
-        current_state = self._serialize_char(self.char)
-        return current_state != getattr(self, "_last_saved_state", "")
+        if self._serialize_char(self.char) != getattr(self, "_last_saved_hash", b""):
+            return True
+        self._dirty = False  # edits were undone; nothing to save
+        return False
 
     def prompt_save_if_dirty(self) -> str:
         """
@@ -2893,7 +3298,42 @@ class CharacterSheet(ttk.Frame):
         else:
             return "cancelled"
 
+    def destroy(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        super().destroy()
+
+    def run_in_background(self, fn, on_done, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the sheet's worker pool and call on_done(result)
+        on the Tk thread when it finishes (on_done(None) if fn raised).
+        The worker never touches Tk; the result is picked up by polling with after().
+        """
+        future = self._executor.submit(fn, *args, **kwargs)
+
+        def poll():
+            if not self.winfo_exists():
+                return
+            if not future.done():
+                self.after(50, poll)
+                return
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Warning: Background task failed: {e}")
+                result = None
+            on_done(result)
+
+        self.after(50, poll)
+        return future
+
     def _on_name_changed(self, *args):
+        # Typing fires this per keystroke; retitle once the burst settles.
+        if getattr(self, "_name_update_id", None):
+            self.after_cancel(self._name_update_id)
+        self._name_update_id = self.after(150, self._do_name_update)
+
+    def _do_name_update(self):
+        self._name_update_id = None
         app = self.winfo_toplevel()
         if hasattr(app, 'master_notebook') and hasattr(app, '_update_title'):
             try:
@@ -2973,10 +3413,12 @@ class CharacterSheet(ttk.Frame):
         self.inv_tabs = ttk.Notebook(frame)
         self.inv_tabs.pack(fill=tk.BOTH, expand=True)
 
+        # Only the first category is built now; the others on first view.
         for key, label in [("equipment", "Equipment"), ("bag", "Bag"), ("storage", "Storage")]:
             f = ttk.Frame(self.inv_tabs)
             self.inv_tabs.add(f, text=label)
-            self._build_inventory_category(f, key)
+            self._add_category_tab(self.inv_tabs, f, key, self._build_inventory_category,
+                                   eager=(key == "equipment"))
 
         # Currency sub-tab
         currency_frame = ttk.Frame(self.inv_tabs)
@@ -3447,6 +3889,7 @@ class CharacterSheet(ttk.Frame):
         for it in self.inv_data.get("equipment", []):
             if it.get("armor_slot", "") == slot:
                 it["armor_slot"] = ""
+                self.mark_dirty()
                 self.inv_render("equipment")
                 self._refresh_body_map()
                 self.body_map_slot_name.set(slot)
@@ -3652,7 +4095,7 @@ class CharacterSheet(ttk.Frame):
 
         ttk.Combobox(
             move_box,
-            values=[k for k in self.inv_keys if k != key],
+            values=self._inv_move_targets[key],
             textvariable=self.inv_move_target[key],
             state="readonly",
             width=12
@@ -3675,31 +4118,35 @@ class CharacterSheet(ttk.Frame):
         details.grid_columnconfigure(1, weight=1)
         details.grid_rowconfigure(notes_row, weight=1)
 
-    def _select_ref_in_listbox(self, lb: tk.Listbox, data_list: list, ref_obj):
+    def _select_listbox_index(self, lb: tk.Listbox, idx):
+        """Select (and scroll to) row idx, or clear the selection if idx is None."""
         lb.selection_clear(0, tk.END)
-        if ref_obj is None:
-            return
-        for idx, obj in enumerate(data_list):
-            if obj is ref_obj:
-                lb.selection_set(idx)
-                lb.see(idx)
-                break
+        if idx is not None:
+            lb.selection_set(idx)
+            lb.see(idx)
 
     def inv_render(self, key: str):
         selected_ref = self.inv_selected_ref.get(key)
         self.inv_data[key] = sort_favorites_first(self.inv_data[key])
 
-        lb: tk.Listbox = getattr(self, f"inv_list_{key}")
-        lb.delete(0, tk.END)
-        for it in self.inv_data[key]:
+        lb: tk.Listbox = getattr(self, f"inv_list_{key}", None)
+        if lb is None or self._category_hidden(self.inv_tabs, key):
+            self.refresh_combat_list()
+            return
+        lines = []
+        sel_idx = None  # found while building rows; saves a second identity scan
+        for idx, it in enumerate(self.inv_data[key]):
+            if it is selected_ref and sel_idx is None:
+                sel_idx = idx
             star = "⭐ " if it.get("favorite", False) else ""
             rng = " (R)" if it.get("is_ranged", False) else ""
             cons = " [C]" if it.get("consumable", False) else ""
             growth = " [G]" if it.get("is_growth_item", False) else ""
             slot = f" [{it['armor_slot']}]" if it.get("armor_slot", "") else ""
-            lb.insert(tk.END, f"{star}{it.get('name','')}{rng}{cons}{growth}{slot}")
+            lines.append(f"{star}{it.get('name','')}{rng}{cons}{growth}{slot}")
+        sync_listbox(lb, lines)
 
-        self._select_ref_in_listbox(lb, self.inv_data[key], selected_ref)
+        self._select_listbox_index(lb, sel_idx)
         self.refresh_combat_list()
 
     def inv_add(self, key: str):
@@ -3721,6 +4168,7 @@ class CharacterSheet(ttk.Frame):
             "armor_slot": "",
         })
         self.inv_new_name[key].set("")
+        self.mark_dirty()
         self.inv_render(key)
         self._refresh_carry_display()
 
@@ -3734,6 +4182,7 @@ class CharacterSheet(ttk.Frame):
                 removed = self.inv_data[key].pop(idx)
                 if removed is self.inv_selected_ref.get(key):
                     self.inv_selected_ref[key] = None
+        self.mark_dirty()
         self.inv_render(key)
         self._refresh_equipment_boosts_display()
         self._recount_growth_items()
@@ -3748,6 +4197,7 @@ class CharacterSheet(ttk.Frame):
         if 0 <= idx < len(self.inv_data[key]):
             self.inv_data[key][idx]["favorite"] = not bool(self.inv_data[key][idx].get("favorite", False))
             self.inv_selected_ref[key] = self.inv_data[key][idx]
+        self.mark_dirty()
         self.inv_render(key)
 
     def inv_on_select(self, key: str):
@@ -3893,6 +4343,7 @@ class CharacterSheet(ttk.Frame):
         notes_box: tk.Text = getattr(self, f"inv_notes_box_{key}")
         it["notes"] = notes_box.get("1.0", tk.END).rstrip("\n")
 
+        self.mark_dirty()
         self.inv_render(key)
         self._refresh_equipment_boosts_display()
         self._recount_growth_items()
@@ -3901,7 +4352,9 @@ class CharacterSheet(ttk.Frame):
 
     def inv_boost_render(self, key: str):
         """Refresh the boost listbox for the given inventory category."""
-        lb: tk.Listbox = getattr(self, f"inv_boost_list_{key}")
+        lb: tk.Listbox = getattr(self, f"inv_boost_list_{key}", None)
+        if lb is None:
+            return
         lb.delete(0, tk.END)
         stat_label_map = {k: lbl for k, lbl in BOOST_TARGET_LABELS}
         for b in self.inv_boost_data[key]:
@@ -3933,6 +4386,7 @@ class CharacterSheet(ttk.Frame):
         self.inv_boost_data[key].append({"stat": stat_key, "value": value, "mode": mode})
         # Live-save to item dict
         self.inv_selected_ref[key]["stat_boosts"] = list(self.inv_boost_data[key])
+        self.mark_dirty()
         self.inv_boost_render(key)
         self._refresh_equipment_boosts_display()
 
@@ -3949,6 +4403,7 @@ class CharacterSheet(ttk.Frame):
         it = self.inv_selected_ref.get(key)
         if it is not None:
             it["stat_boosts"] = list(self.inv_boost_data[key])
+        self.mark_dirty()
         self.inv_boost_render(key)
         self._refresh_equipment_boosts_display()
 
@@ -3977,9 +4432,7 @@ class CharacterSheet(ttk.Frame):
         style_tk_widget(txt, colors)
 
         # helpful: prefill with clipboard
-        clip = self._clipboard_get()
-        if clip.strip():
-            txt.insert("1.0", clip)
+        self._prefill_from_clipboard(win, txt)
 
         status = tk.StringVar(value="")
         ttk.Label(win, textvariable=status, foreground=colors["gray"]).pack(anchor="w", padx=10, pady=(0, 8))
@@ -3991,13 +4444,8 @@ class CharacterSheet(ttk.Frame):
                 data = [data]
             if not isinstance(data, list):
                 raise ValueError("JSON must be an object or a list of objects.")
-            items = [ensure_item_obj(d) for d in data]  # your existing normalizer
-            # ensure apply_bonus synced
-            for it in items:
-                ab = bool(it.get("apply_bonus", it.get("apply_pbd", True)))
-                it["apply_bonus"] = ab
-                it["apply_pbd"] = ab
-            return items
+            # ensure_item_obj already keeps apply_bonus/apply_pbd in sync
+            return [ensure_item_obj(d) for d in data]
 
         def add_items():
             try:
@@ -4008,6 +4456,7 @@ class CharacterSheet(ttk.Frame):
             for it in items:
                 if (it.get("name") or "").strip():
                     self.inv_data[key].append(it)
+            self.mark_dirty()
             self.inv_render(key)
             self.refresh_combat_list()
             status.set(f"Added {len(items)} item(s).")
@@ -4029,6 +4478,7 @@ class CharacterSheet(ttk.Frame):
             # replace in-place to preserve object identity (refs)
             target.clear()
             target.update(new_it)
+            self.mark_dirty()
             self.inv_render(key)
             self.refresh_combat_list()
             status.set("Replaced selected item.")
@@ -4062,6 +4512,7 @@ class CharacterSheet(ttk.Frame):
         self.inv_data[to_key].append(it)
         self.inv_selected_ref[from_key] = None
 
+        self.mark_dirty()
         self.inv_render(from_key)
         self.inv_render(to_key)
         self._refresh_equipment_boosts_display()
@@ -4081,7 +4532,58 @@ class CharacterSheet(ttk.Frame):
                            ("learned", "Learned Skills")]:
             f = ttk.Frame(self.ability_tabs)
             self.ability_tabs.add(f, text=label)
-            self._build_ability_category(f, key)
+            self._add_category_tab(self.ability_tabs, f, key, self._build_ability_category,
+                                   eager=(key == "core"))
+
+    def _add_category_tab(self, notebook, frame, key: str, builder, eager: bool):
+        """
+        Build an inventory/ability category now, or defer it until its tab is
+        first selected. Until then the category's list widgets don't exist and
+        the render methods only keep its data sorted.
+        """
+        if not hasattr(notebook, "_category_tabs"):
+            notebook._category_tabs = {}  # category key -> tab id
+            notebook._lazy_tabs = {}
+            notebook._stale = set()       # built, but rendered while hidden
+            notebook.bind("<<NotebookTabChanged>>",
+                          lambda _e, nb=notebook: self._on_category_tab_changed(nb), add="+")
+        notebook._category_tabs[key] = str(frame)
+        if eager:
+            builder(frame, key)
+        else:
+            notebook._lazy_tabs[str(frame)] = (frame, key, builder)
+
+    def _category_hidden(self, notebook, key: str) -> bool:
+        """
+        True if `key`'s tab isn't the one showing; the category is then marked
+        stale and its list is brought up to date when the tab is selected.
+        """
+        if notebook.select() == notebook._category_tabs[key]:
+            return False
+        notebook._stale.add(key)
+        return True
+
+    def _on_category_tab_changed(self, notebook):
+        tab = notebook.select()
+        pending = notebook._lazy_tabs.pop(tab, None)
+        if pending is not None:
+            frame, key, builder = pending
+            first_new = len(self._tk_widgets)
+            builder(frame, key)
+            colors = self._get_current_colors()
+            for w in self._tk_widgets[first_new:]:
+                style_tk_widget(w, colors)
+        else:
+            key = next((k for k, t in notebook._category_tabs.items() if t == tab), None)
+            if key not in notebook._stale:
+                return
+        notebook._stale.discard(key)
+        if notebook is self.inv_tabs:
+            self.inv_render(key)
+            self.inv_boost_render(key)
+        else:
+            self.ability_render(key)
+            self.ability_boost_render(key)
 
     def _build_ability_category(self, parent, key: str):
         outer = ttk.Frame(parent)
@@ -4222,18 +4724,25 @@ class CharacterSheet(ttk.Frame):
         selected_ref = self.ability_selected_ref.get(key)
         self.abilities_data[key] = sort_favorites_first(self.abilities_data[key])
 
-        lb: tk.Listbox = getattr(self, f"ability_list_{key}")
-        lb.delete(0, tk.END)
-        for ab in self.abilities_data[key]:
+        lb: tk.Listbox = getattr(self, f"ability_list_{key}", None)
+        if lb is None or self._category_hidden(self.ability_tabs, key):
+            self.refresh_combat_list()
+            return
+        lines = []
+        sel_idx = None
+        for idx, ab in enumerate(self.abilities_data[key]):
+            if ab is selected_ref and sel_idx is None:
+                sel_idx = idx
             star = "⭐ " if ab.get("favorite", False) else ""
             ab_boosts = ab.get("stat_boosts", [])
             ab_bt = _safe_int(ab.get("buff_turns"), 0)
             marker = ""
             if ab_boosts:
                 marker = " [P]" if ab_bt == 0 else " [B]"
-            lb.insert(tk.END, f"{star}{ab.get('name','')}{marker}")
+            lines.append(f"{star}{ab.get('name','')}{marker}")
+        sync_listbox(lb, lines)
 
-        self._select_ref_in_listbox(lb, self.abilities_data[key], selected_ref)
+        self._select_listbox_index(lb, sel_idx)
         self.refresh_combat_list()
 
     def ability_add(self, key: str):
@@ -4242,6 +4751,7 @@ class CharacterSheet(ttk.Frame):
             return
         self.abilities_data[key].append(ensure_ability_obj({"name": name}))
         self.var_new_ability_name[key].set("")
+        self.mark_dirty()
         self.ability_render(key)
 
     def ability_remove(self, key: str):
@@ -4254,6 +4764,7 @@ class CharacterSheet(ttk.Frame):
                 removed = self.abilities_data[key].pop(idx)
                 if removed is self.ability_selected_ref.get(key):
                     self.ability_selected_ref[key] = None
+        self.mark_dirty()
         self.ability_render(key)
 
     def ability_toggle_favorite(self, key: str):
@@ -4265,6 +4776,7 @@ class CharacterSheet(ttk.Frame):
         if 0 <= idx < len(self.abilities_data[key]):
             self.abilities_data[key][idx]["favorite"] = not bool(self.abilities_data[key][idx].get("favorite", False))
             self.ability_selected_ref[key] = self.abilities_data[key][idx]
+        self.mark_dirty()
         self.ability_render(key)
 
     def ability_on_select(self, key: str):
@@ -4337,6 +4849,7 @@ class CharacterSheet(ttk.Frame):
         ab["stat_boosts"] = list(self.ability_boost_data[key])
         ab["buff_turns"] = _safe_int(self.ability_buff_turns[key].get(), 0)
 
+        self.mark_dirty()
         self.ability_render(key)
         self._refresh_equipment_boosts_display()
 
@@ -4344,7 +4857,9 @@ class CharacterSheet(ttk.Frame):
 
     def ability_boost_render(self, key: str):
         """Refresh the boost listbox for the given ability category."""
-        lb: tk.Listbox = getattr(self, f"ability_boost_list_{key}")
+        lb: tk.Listbox = getattr(self, f"ability_boost_list_{key}", None)
+        if lb is None:
+            return
         lb.delete(0, tk.END)
         stat_label_map = {k: lbl for k, lbl in BOOST_TARGET_LABELS}
         for b in self.ability_boost_data[key]:
@@ -4373,6 +4888,7 @@ class CharacterSheet(ttk.Frame):
             return
         self.ability_boost_data[key].append({"stat": stat_key, "value": value, "mode": mode})
         self.ability_selected_ref[key]["stat_boosts"] = list(self.ability_boost_data[key])
+        self.mark_dirty()
         self.ability_boost_render(key)
         self._refresh_equipment_boosts_display()
 
@@ -4388,6 +4904,7 @@ class CharacterSheet(ttk.Frame):
         ab = self.ability_selected_ref.get(key)
         if ab is not None:
             ab["stat_boosts"] = list(self.ability_boost_data[key])
+        self.mark_dirty()
         self.ability_boost_render(key)
         self._refresh_equipment_boosts_display()
 
@@ -4415,9 +4932,7 @@ class CharacterSheet(ttk.Frame):
         txt.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
         style_tk_widget(txt, colors)
 
-        clip = self._clipboard_get()
-        if clip.strip():
-            txt.insert("1.0", clip)
+        self._prefill_from_clipboard(win, txt)
 
         status = tk.StringVar(value="")
         ttk.Label(win, textvariable=status, foreground=colors["gray"]).pack(anchor="w", padx=10, pady=(0, 8))
@@ -4441,6 +4956,7 @@ class CharacterSheet(ttk.Frame):
             for ab in abs_:
                 if (ab.get("name") or "").strip():
                     self.abilities_data[slot].append(ab)
+            self.mark_dirty()
             self.ability_render(slot)
             self.refresh_combat_list()
             status.set(f"Added {len(abs_)} ability(s).")
@@ -4461,6 +4977,7 @@ class CharacterSheet(ttk.Frame):
             new_ab = abs_[0]
             target.clear()
             target.update(new_ab)
+            self.mark_dirty()
             self.ability_render(slot)
             self.refresh_combat_list()
             status.set("Replaced selected ability.")
@@ -4494,6 +5011,7 @@ class CharacterSheet(ttk.Frame):
         self.ability_selected_ref[from_slot] = None
 
         # Re-render both lists and refresh combat list
+        self.mark_dirty()
         self.ability_render(from_slot)
         self.ability_render(to_slot)
         self.refresh_combat_list()
@@ -4589,7 +5107,42 @@ class CharacterSheet(ttk.Frame):
         edit_frame.grid_columnconfigure(1, weight=1)
 
         # Functions
+        spell_queue = queue.Queue()
+        generating = False
+
+        def show_option(spell):
+            display = f"{spell['name']} ({spell['roll_type']}, {spell['mana_cost']} mana)"
+            options_list.insert(tk.END, display)
+
+        def drain_spell_queue():
+            """Move spells produced by the worker thread into the listbox."""
+            nonlocal generated_spells, generating
+            if not win.winfo_exists():
+                return
+            while True:
+                try:
+                    kind, payload = spell_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == "spell":
+                    generated_spells.append(payload)
+                    show_option(payload)
+                    status.set(f"Generating... {len(generated_spells)} spell(s) ready.")
+                else:  # "done": final list (template fallbacks included)
+                    generating = False
+                    if payload != generated_spells:
+                        generated_spells = payload
+                        options_list.delete(0, tk.END)
+                        for spell in generated_spells:
+                            show_option(spell)
+                    status.set(f"Generated {len(generated_spells)} spell options.")
+                    return
+            win.after(50, drain_spell_queue)
+
         def on_generate():
+            nonlocal generated_spells, generating
+            if generating:
+                return
             prompt = prompt_text.get("1.0", tk.END).strip()
             if not prompt:
                 status.set("Please enter a research prompt.")
@@ -4604,19 +5157,27 @@ class CharacterSheet(ttk.Frame):
 
             char_stats = {k: self._get_effective_stat(k) for k in STAT_KEYS}
 
-            # Generate spells (with Ollama if available)
-            nonlocal generated_spells
-            generated_spells = generate_spell_options(
-                prompt_data, key, tier, mana_density, char_stats, original_prompt=prompt
-            )
-
-            # Populate listbox
+            # Generate spells (with Ollama if available) off the Tk thread; spells
+            # stream back through spell_queue and appear as soon as each is ready.
+            generated_spells = []
             options_list.delete(0, tk.END)
-            for spell in generated_spells:
-                display = f"{spell['name']} ({spell['roll_type']}, {spell['mana_cost']} mana)"
-                options_list.insert(tk.END, display)
+            status.set("Generating...")
+            generating = True
 
-            status.set(f"Generated {len(generated_spells)} spell options.")
+            def worker():
+                spells = []
+                try:
+                    spells = generate_spell_options(
+                        prompt_data, key, tier, mana_density, char_stats, original_prompt=prompt,
+                        on_spell=lambda i, spell: spell_queue.put(("spell", spell)),
+                    )
+                except Exception as e:
+                    print(f"Warning: Spell research failed: {e}")
+                finally:
+                    spell_queue.put(("done", spells))
+
+            self._executor.submit(worker)
+            win.after(50, drain_spell_queue)
 
         def on_select(event):
             sel = list(options_list.curselection())
@@ -4651,7 +5212,7 @@ class CharacterSheet(ttk.Frame):
                 return
 
             idx = sel[0]
-            spell = generated_spells[idx].copy()
+            spell = deepcopy(generated_spells[idx])
 
             # Update from edit fields
             spell["name"] = name_var.get().strip()
@@ -4672,10 +5233,21 @@ class CharacterSheet(ttk.Frame):
 
             # Add to character
             self.abilities_data[key].append(ensure_ability_obj(spell))
+            self.mark_dirty()
             self.ability_render(key)
 
             status.set(f"Added '{spell['name']}' to {key} abilities.")
 
+        def library_metadata():
+            return {
+                "date_created": datetime.now().isoformat(),
+                "source_character": self.var_name.get() or "Unknown",
+                "element": "unknown",  # Could parse from spell name/notes
+                "archetype": "unknown",  # Could parse from spell type
+                "tier": self.var_tier.get() or "T1",
+                "category": key
+            }
+
         def on_save_to_library():
             if not generated_spells:
                 status.set("Generate spells first.")
@@ -4687,7 +5259,7 @@ class CharacterSheet(ttk.Frame):
                 return
 
             idx = sel[0]
-            spell = generated_spells[idx].copy()
+            spell = deepcopy(generated_spells[idx])
 
             # Update from edit fields
             spell["name"] = name_var.get().strip()
@@ -4706,20 +5278,20 @@ class CharacterSheet(ttk.Frame):
 
             spell["notes"] = notes_box.get("1.0", tk.END).rstrip("\n")
 
-            # Create metadata
-            metadata = {
-                "date_created": datetime.now().isoformat(),
-                "source_character": self.var_name.get() or "Unknown",
-                "element": "unknown",  # Could parse from spell name/notes
-                "archetype": "unknown",  # Could parse from spell type
-                "tier": self.var_tier.get() or "T1",
-                "category": key
-            }
-
             # Save to library
-            spell_id = add_spell_to_library(spell, metadata)
+            spell_id = add_spell_to_library(spell, library_metadata(), copy=False)
             status.set(f"Saved '{spell['name']}' to library.")
 
+        def on_save_all_to_library():
+            if not generated_spells:
+                status.set("Generate spells first.")
+                return
+
+            # One library load/save for the whole batch (copied: the dialog keeps its spells)
+            metadata = library_metadata()
+            add_spells_to_library([(spell, metadata) for spell in generated_spells])
+            status.set(f"Saved {len(generated_spells)} spells to library.")
+
         # Bind selection
         options_list.bind("<<ListboxSelect>>", on_select)
 
@@ -4732,6 +5304,7 @@ class CharacterSheet(ttk.Frame):
 
         ttk.Button(bottom_btns, text="Add to Character", command=on_add).pack(side=tk.LEFT)
         ttk.Button(bottom_btns, text="Save to Library", command=on_save_to_library).pack(side=tk.LEFT, padx=8)
+        ttk.Button(bottom_btns, text="Save All to Library", command=on_save_all_to_library).pack(side=tk.LEFT)
         ttk.Button(bottom_btns, text="Close", command=win.destroy).pack(side=tk.RIGHT)
 
     def spell_upgrade_dialog(self, key: str):
@@ -4842,16 +5415,17 @@ class CharacterSheet(ttk.Frame):
         edit_frame.grid_columnconfigure(1, weight=1)
 
         # Functions
-        def on_generate():
-            # Get training prompt
-            prompt = prompt_text.get("1.0", tk.END).strip()
-
-            # Get character context
-            tier = self.var_tier.get() or "T1"
+        generating = False
 
-            # Generate upgrades (with optional prompt for Ollama)
-            nonlocal generated_upgrades
-            generated_upgrades = generate_spell_upgrades(ab, key, tier, training_prompt=prompt)
+        def on_generated(upgrades):
+            nonlocal generated_upgrades, generating
+            generating = False
+            if not win.winfo_exists():
+                return
+            if upgrades is None:
+                status.set("Upgrade generation failed.")
+                return
+            generated_upgrades = upgrades
 
             # Populate listbox
             options_list.delete(0, tk.END)
@@ -4861,6 +5435,22 @@ class CharacterSheet(ttk.Frame):
 
             status.set(f"Generated {len(generated_upgrades)} upgrade options.")
 
+        def on_generate():
+            nonlocal generating
+            if generating:
+                return
+            # Get training prompt
+            prompt = prompt_text.get("1.0", tk.END).strip()
+
+            # Get character context
+            tier = self.var_tier.get() or "T1"
+
+            # Generate upgrades (with optional prompt for Ollama) off the Tk thread
+            generating = True
+            status.set("Generating...")
+            self.run_in_background(generate_spell_upgrades, on_generated,
+                                   ab, key, tier, training_prompt=prompt)
+
         def on_select(event):
             sel = list(options_list.curselection())
             if len(sel) != 1:
@@ -4894,7 +5484,7 @@ class CharacterSheet(ttk.Frame):
                 return
 
             idx = sel[0]
-            upgrade = generated_upgrades[idx].copy()
+            upgrade = deepcopy(generated_upgrades[idx])
 
             # Update from edit fields
             upgrade["name"] = name_var.get().strip()
@@ -4923,7 +5513,7 @@ class CharacterSheet(ttk.Frame):
                     "tier": self.var_tier.get() or "T1",
                     "category": key
                 }
-                add_spell_to_library(ab.copy(), metadata)
+                add_spell_to_library(ab, metadata)
 
             # Replace original spell with upgrade
             # Find the spell in abilities_data and replace it
@@ -4936,6 +5526,7 @@ class CharacterSheet(ttk.Frame):
                 self.abilities_data[key].append(ensure_ability_obj(upgrade))
                 self.ability_selected_ref[key] = self.abilities_data[key][-1]
 
+            self.mark_dirty()
             self.ability_render(key)
             self.ability_on_select(key)  # Refresh the details panel
 
@@ -5174,23 +5765,26 @@ class CharacterSheet(ttk.Frame):
         try:
             char = {
                 "name": self.var_name.get() or "Character A",
-                "stats": {},
-                "hp_max": self._get_effective_hp_max(),
-                "hp_current": int(self.var_hp_current.get().strip() or "20"),
-                "mana_max": self._get_effective_mana_max(),
-                "mana_current": int(self.var_mana_current.get().strip() or "10"),
-                "mana_density": self._get_effective_stat("mana_density"),
+                "stats": sim_stats(self._get_effective_stat),
+                "res": sim_resources(
+                    int(self.var_hp_current.get().strip() or "20"),
+                    self._get_effective_hp_max(),
+                    int(self.var_mana_current.get().strip() or "10"),
+                    self._get_effective_mana_max(),
+                    self._get_effective_stat("mana_density"),
+                ),
                 "actions": [],
             }
-            for k in STAT_KEYS:
-                char["stats"][k] = self._get_effective_stat(k)
-
             # Build actions from equipment + abilities
             self.refresh_combat_list()
             for a in self.combat_actions:
+                acc_idx, acc_label = accuracy_source(a["kind"], a["ref"])
                 char["actions"].append({
                     "kind": a["kind"],
                     "slot": a.get("slot"),
+                    "slot_idx": slot_index(a.get("slot") or "inner"),
+                    "acc_idx": acc_idx,
+                    "acc_label": acc_label,
                     "ref": a["ref"],
                     "name": a.get("name", ""),
                     "display": a.get("display", a.get("name", "")),
@@ -5381,7 +5975,8 @@ class CharacterSheet(ttk.Frame):
             messagebox.showinfo("Import", "Select a spell first.")
             return
 
-        spell = import_spell_from_library(self.library_selected_id)
+        # Read-only: do_import builds a fresh ability via ensure_ability_obj.
+        spell = import_spell_from_library(self.library_selected_id, copy=False)
         if not spell:
             messagebox.showerror("Error", "Spell not found.")
             return
@@ -5406,6 +6001,7 @@ class CharacterSheet(ttk.Frame):
         def do_import():
             category = category_var.get()
             self.abilities_data[category].append(ensure_ability_obj(spell))
+            self.mark_dirty()
             self.ability_render(category)
             win.destroy()
             messagebox.showinfo("Imported", f"Added '{spell.get('name', '')}' to {category} abilities.")
@@ -5604,6 +6200,7 @@ class CharacterSheet(ttk.Frame):
         def do_import():
             category = cat_var.get()
             self.inv_data[category].append(ensure_item_obj(item))
+            self.mark_dirty()
             self.inv_render(category)
             self._refresh_equipment_boosts_display()
             win.destroy()
@@ -5880,9 +6477,10 @@ class CharacterSheet(ttk.Frame):
         actions = sorted(actions, key=lambda a: (not a["favorite"], a["name"].lower(), a["kind"], a.get("slot") or ""))
         self.combat_actions = actions
 
-        self.combat_list.delete(0, tk.END)
-        for a in actions:
-            self.combat_list.insert(tk.END, a["display"])
+        # Most refreshes follow edits that don't change the list; only the rows
+        # that differ are rewritten.
+        sync_listbox(self.combat_list, [a["display"] for a in actions])
+        self.combat_list.selection_clear(0, tk.END)
 
         if keep_ref is not None:
             for idx, a in enumerate(self.combat_actions):
@@ -6062,7 +6660,7 @@ class CharacterSheet(ttk.Frame):
             # Buff-only spell (no damage) — spend mana, apply buff, skip damage
             if not has_dmg_early and ab_boosts_early and ab_bt_early > 0 and base_cost_early > 0:
                 slot_e = chosen.get("slot", "inner")
-                mana_mult_e = float(ABILITY_MODS.get(slot_e, {"mana": 1.0})["mana"])
+                mana_mult_e = ABILITY_MODS.get(slot_e, NEUTRAL_ABILITY_MODS).mana
                 try:
                     spend_base_e = int((self.var_combat_mana_spend.get().strip() or str(base_cost_early)).strip())
                 except ValueError:
@@ -6093,6 +6691,7 @@ class CharacterSheet(ttk.Frame):
                     "source": ref.get("name", "spell"),
                 }
                 add_status_effect_to_char(self.char, raw, self_tier)
+                self.mark_dirty()
                 self._render_status_effects()
                 self._refresh_equipment_boosts_display()
                 self.var_combat_result.set(
@@ -6157,9 +6756,9 @@ class CharacterSheet(ttk.Frame):
         # -------- Abilities: slot multipliers + overcast + mana density --------
         # (Passive and buff-only spells already handled above before damage parsing)
         slot = chosen.get("slot", "inner")
-        mods = ABILITY_MODS.get(slot, {"dmg": 1.0, "mana": 1.0})
-        dmg_mult = float(mods["dmg"])
-        mana_mult = float(mods["mana"])
+        mods = ABILITY_MODS.get(slot, NEUTRAL_ABILITY_MODS)
+        dmg_mult = mods.dmg
+        mana_mult = mods.mana
 
         ab_boosts = ref.get("stat_boosts", [])
         ab_buff_turns = _safe_int(ref.get("buff_turns"), 0)
@@ -6210,6 +6809,7 @@ class CharacterSheet(ttk.Frame):
                 "dot_damage": 0, "dot_healing": 0, "stacks": 1, "max_stacks": 1,
                 "source": ref.get("name", "spell"),
             }, self_tier)
+            self.mark_dirty()
             self._render_status_effects()
             self._refresh_equipment_boosts_display()
             buff_note = f" | Buff applied ({ab_buff_turns} turns)"
@@ -6258,7 +6858,7 @@ class CharacterSheet(ttk.Frame):
         perm_override = False
         _pre_stat = ref.get("consume_perm_stat", "")
         _pre_val = _safe_int(ref.get("consume_perm_value"), 0)
-        if _pre_stat in STAT_KEYS and _pre_val > 0:
+        if _pre_stat in STAT_KEYS_SET and _pre_val > 0:
             tp = self.char.setdefault("tier_points", {})
             pool = _safe_int(tp.get("perm_buff_pool"), 0)
             n = tier_num(self.var_tier.get())
@@ -6328,7 +6928,7 @@ class CharacterSheet(ttk.Frame):
                 except ValueError:
                     return default
 
-            if perm_stat in STAT_KEYS:
+            if perm_stat in STAT_KEYS_SET:
                 cur = _cur_int(self.var_stats[perm_stat])
                 if perm_val > 0:
                     # Positive perm gains run through the pool + diminishing returns.
@@ -6386,6 +6986,7 @@ class CharacterSheet(ttk.Frame):
         self.combat_selected_kind = None
         self.inv_selected_ref["equipment"] = None
 
+        self.mark_dirty()
         self.inv_render("equipment")
         self.refresh_combat_list()
         self._refresh_equipment_boosts_display()
@@ -6622,6 +7223,7 @@ class CharacterSheet(ttk.Frame):
             return
         tp = self.char.setdefault("tier_points", {})
         tp["normal_earned_lifetime"] = _safe_int(tp.get("normal_earned_lifetime"), 0) + n
+        self.mark_dirty()
         self._refresh_tier_progress()
 
     def _refresh_tier_progress(self):
@@ -6683,6 +7285,7 @@ class CharacterSheet(ttk.Frame):
         if not messagebox.askyesno("Advance Tier", msg):
             return
 
+        self.mark_dirty()
         tp["tierup_bonus_pool"] = _safe_int(tp.get("tierup_bonus_pool"), 0) + bonus
         self._apply_slot_maxes_for_tier(new_n)
         self.var_tier.set(f"T{new_n}")  # trace refreshes progress + button
@@ -6721,6 +7324,7 @@ class CharacterSheet(ttk.Frame):
         if val is not None:
             tp["normal_earned_lifetime"] = _safe_int(val, 0)
         tp["initialized"] = True
+        self.mark_dirty()
         self._refresh_tier_progress()
 
     # ---------------- Status effects ----------------
@@ -6788,6 +7392,7 @@ class CharacterSheet(ttk.Frame):
                     f"{raw['name']} fizzled — too weak across the tier gap to do anything.")
             else:
                 self.var_status_fx_result.set(f"Applied {eff['name']} (x{eff.get('stacks', 1)}).")
+            self.mark_dirty()
             self._render_status_effects()
             self._refresh_equipment_boosts_display()
             win.destroy()
@@ -6808,6 +7413,7 @@ class CharacterSheet(ttk.Frame):
             if 0 <= idx < len(effects):
                 removed = effects.pop(idx)
                 self.var_status_fx_result.set(f"Removed {removed.get('name', '?')}.")
+        self.mark_dirty()
         self._render_status_effects()
         self._refresh_equipment_boosts_display()
 
@@ -6847,6 +7453,7 @@ class CharacterSheet(ttk.Frame):
         if expired:
             msg += f" Expired: {', '.join(expired)}."
         self.var_status_fx_result.set(msg)
+        self.mark_dirty()
         self._render_status_effects()
         self._refresh_equipment_boosts_display()
 
@@ -7193,6 +7800,7 @@ class CharacterSheet(ttk.Frame):
                 self._add_normal_points_spent(spent)
                 source_note = ""
 
+            self.mark_dirty()
             self._refresh_mana_density_display()
             refresh_unspent_label()
             result_var.set(f"Spent {spent}{source_note}. {gained_text}{cap_note}")
@@ -7265,27 +7873,18 @@ class CharacterSheet(ttk.Frame):
         _migrate_stats_schema(c)
         _migrate_tier_schema(c)
 
-        self.var_name.set(c.get("name", ""))
-        self.var_tier.set(c.get("tier", ""))
-
-        res = c.get("resources", {})
-        hp = res.get("hp", {})
-        mana = res.get("mana", {})
-        self.var_hp_current.set(str(hp.get("current", 0)))
-        self.var_hp_max.set(str(hp.get("max", 0)))
-        self.var_mana_current.set(str(mana.get("current", 0)))
-        self.var_mana_max.set(str(mana.get("max", 0)))
-        self.var_unspent.set(str(res.get("unspent_points", 0)))
+        for attr, path, is_int in _SCALAR_FIELDS:
+            node = c
+            for part in path[:-1]:
+                node = node.get(part, {})
+            value = node.get(path[-1], 0 if is_int else "")
+            getattr(self, attr).set(str(value) if is_int else value)
 
         stats = c.get("stats", {})
         for k in STAT_KEYS:
             self.var_stats[k].set(str(stats.get(k, 0)))
         self._refresh_mana_density_display()
 
-        growth = c.get("growth_items", {})
-        self.var_growth_current.set(str(growth.get("bound_current", 0)))
-        self.var_growth_max.set(str(growth.get("bound_max", 0)))
-
         inv = c.get("inventory")
         if not isinstance(inv, dict):
             inv = {"equipment": [], "bag": [], "storage": []}
@@ -7316,8 +7915,9 @@ class CharacterSheet(ttk.Frame):
             self.inv_is_growth_item[k].set(False)
             self.inv_weight[k].set("0")
             self.inv_armor_slot[k].set("(none)")
-            nb: tk.Text = getattr(self, f"inv_notes_box_{k}")
-            nb.delete("1.0", tk.END)
+            nb: tk.Text = getattr(self, f"inv_notes_box_{k}", None)
+            if nb is not None:
+                nb.delete("1.0", tk.END)
 
         self._recount_growth_items()
 
@@ -7349,8 +7949,9 @@ class CharacterSheet(ttk.Frame):
             self.ability_boost_data[slot] = []
             self.ability_buff_turns[slot].set("0")
 
-            nb: tk.Text = getattr(self, f"ability_notes_box_{slot}")
-            nb.delete("1.0", tk.END)
+            nb: tk.Text = getattr(self, f"ability_notes_box_{slot}", None)
+            if nb is not None:
+                nb.delete("1.0", tk.END)
 
         eff = find_show_must_go_on(c)
         if eff and "uses" in eff:
@@ -7385,25 +7986,18 @@ class CharacterSheet(ttk.Frame):
 
     def apply_to_model(self):
         c = self.char
-        c["name"] = self.var_name.get()
-        c["tier"] = self.var_tier.get()
-
-        def to_int_var(var, default=0):
-            try:
-                return int(var.get())
-            except ValueError:
-                return default
 
-        res = c.setdefault("resources", {})
-        hp = res.setdefault("hp", {})
-        mana = res.setdefault("mana", {})
-
-        hp["current"] = to_int_var(self.var_hp_current)
-        hp["max"] = to_int_var(self.var_hp_max)
-        mana["current"] = to_int_var(self.var_mana_current)
-        mana["max"] = to_int_var(self.var_mana_max)
-
-        res["unspent_points"] = to_int_var(self.var_unspent)
+        for attr, path, is_int in _SCALAR_FIELDS:
+            node = c
+            for part in path[:-1]:
+                node = node.setdefault(part, {})
+            value = getattr(self, attr).get()
+            if is_int:
+                try:
+                    value = int(value)
+                except ValueError:
+                    value = 0
+            node[path[-1]] = value
 
         stats = c.setdefault("stats", {})
         for k in STAT_KEYS:
@@ -7412,10 +8006,6 @@ class CharacterSheet(ttk.Frame):
             except Exception:
                 stats[k] = 0
 
-        growth = c.setdefault("growth_items", {})
-        growth["bound_current"] = to_int_var(self.var_growth_current)
-        growth["bound_max"] = to_int_var(self.var_growth_max)
-
         # Inventory save
         inv = c.setdefault("inventory", {"equipment": [], "bag": [], "storage": []})
         for k in self.inv_keys:
@@ -7424,7 +8014,7 @@ class CharacterSheet(ttk.Frame):
                 name = (it.get("name") or "").strip()
                 if not name:
                     continue
-                apply_bonus = bool(it.get("apply_bonus", it.get("apply_pbd", True)))
+                apply_bonus = bool(it["apply_bonus"] if "apply_bonus" in it else it.get("apply_pbd", True))
                 item_dict = {
                     "name": name,
                     "favorite": bool(it.get("favorite", False)),
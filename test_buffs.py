@@ -10,8 +10,13 @@ These cover the buff bugs fixed in v3.0 work:
 Plus a few baseline formula checks from Context_AI_Rules.md.
 """
 
+import random
+import tempfile
 import unittest
+from pathlib import Path
 
+import battle_sim as bs
+import damage_lab as dl
 import sheet_tool as st
 
 
@@ -294,5 +299,109 @@ class TestStatusEffects(unittest.TestCase):
             self.assertIsNotNone(eff, f"{raw['name']} should apply at same tier")
 
 
+class TestDamageLabFusedCurve(unittest.TestCase):
+    def test_fused_item_curve_within_one(self):
+        # Plot-only fast path folds PBD and target multipliers into one floor.
+        for pts in (0, 37, 100, 250, 900):
+            for target in dl.TARGET_MULTS.values():
+                num, shift = dl._dyadic(target)
+                ctx = dl._PlotContext(kind="item", dice_count=3, die_size=8, flat_bonus=2,
+                                      item_mult=dl.mana_density_multiplier(pts),
+                                      target_mult=target, target_num=num, target_shift=shift)
+                rolls = list(range(0, 61))
+                exact = dl._damage_curve(ctx, rolls, [0] * len(rolls))
+                fused = dl._damage_curve(ctx, rolls, [0] * len(rolls), fuse=True)
+                for e, f in zip(exact, fused):
+                    self.assertIn(f - e, (0, 1))
+
+
+def _sim_fighters():
+    attacker = bs.build_sim_character({
+        "name": "A",
+        "stats": {"melee_acc": 50, "spellcraft": 100, "pbd": 40, "mana_density": 30},
+        "resources": {"hp": {"current": 50, "max": 50}, "mana": {"current": 40, "max": 40}},
+        "inventory": {"equipment": [{"name": "Sword", "damage": "2d6+3"}]},
+        "abilities": {"core": [{"name": "Bolt", "damage": "3d8+2", "mana_cost": 4,
+                                "overcast": {"enabled": True, "scale": 3}}]},
+    })
+    defender = bs.build_sim_character({"name": "B", "stats": {"evasion": 100}})
+    return attacker, defender
+
+
+class TestBattleSimBatch(unittest.TestCase):
+    def _replay(self, attacker, defender, action, n, seed, mana_spend=None):
+        # Re-draw the batch's rolls in the same order and resolve each one through
+        # the single-shot path (resolve_accuracy + resolve_damage).
+        rng = random.Random(seed)
+        dice_count, die_size, _ = bs.parse_damage_expr(action["ref"]["damage"])
+        faces, expected = [], []
+        for _ in range(n):
+            face = rng.randint(1, 20)
+            acc = bs.resolve_accuracy(attacker, defender, action, face)
+            faces.append(acc["glance_mult"])
+            if acc["glance_pct"] == 0:
+                expected.append(0)
+                continue
+            roll = sum(rng.randint(1, die_size) for _ in range(dice_count))
+            expected.append(bs.resolve_damage(attacker, defender, action, roll,
+                                              mana_spend, acc["glance_mult"])["final"])
+        return faces, expected
+
+    def test_outcome_counts_match_accuracy(self):
+        attacker, defender = _sim_fighters()
+        action = attacker["actions"][0]
+        results = bs.simulate_batch(attacker, defender, action, 2000, rng=random.Random(7))
+        glances, _ = self._replay(attacker, defender, action, 2000, 7)
+        misses = sum(1 for g in glances if int(g * 100) == 0)
+        full = sum(1 for g in glances if g == 1.0)
+        self.assertEqual(results.count(0), misses)
+        self.assertEqual(sum(1 for r in results if r > 0), len(glances) - misses)
+        self.assertTrue(0 < full < len(glances) - misses)  # glancing blows occur too
+
+    def test_batch_matches_single_shot(self):
+        attacker, defender = _sim_fighters()
+        for action, spend in ((attacker["actions"][0], None), (attacker["actions"][1], 12)):
+            results = bs.simulate_batch(attacker, defender, action, 500, spend,
+                                        rng=random.Random(3))
+            _, expected = self._replay(attacker, defender, action, 500, 3, spend)
+            self.assertEqual(results, expected, action["name"])
+
+    def test_histogram_bucket_totals(self):
+        results = [0, 0, 3, 7, 7, 12, 25, 25, 25, 40]
+        lines = bs.format_damage_histogram(results, bins=5)
+        total = 0
+        for line in lines:
+            bounds, _, tail = line.partition("|")
+            lo, hi = (int(x) for x in bounds.split("-"))
+            count = int(tail.split()[-1])
+            self.assertEqual(count, sum(1 for v in results if lo <= v <= hi))
+            total += count
+        self.assertEqual(total, len(results))
+        self.assertEqual(bs.format_damage_histogram([]), [])
+
+
+class TestSpellLibraryCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.old_path = st.LIBRARY_PATH
+        st.LIBRARY_PATH = Path(self.tmp.name) / "spell_library.json"
+        st._set_library_cache(None, None)
+
+    def tearDown(self):
+        st.LIBRARY_PATH = self.old_path
+        st._set_library_cache(None, None)
+        self.tmp.cleanup()
+
+    def test_saved_spell_not_aliased(self):
+        # Editing the caller's nested dicts must not reach the cached library.
+        spell = st.ensure_ability_obj({"name": "Bolt"})
+        spell_id = st.add_spell_to_library(spell, {"tier": "T1"})
+        spell["overcast"]["scale"] = 7
+        self.assertEqual(st.import_spell_from_library(spell_id)["overcast"]["scale"], 0)
+        imported = st.import_spell_from_library(spell_id)
+        imported["overcast"]["scale"] = 5
+        self.assertEqual(st.import_spell_from_library(spell_id)["overcast"]["scale"], 0)
+
+
 if __name__ == "__main__":
     unittest.main()